@@ -3,6 +3,7 @@ Vision Pro Dezine – NVR System
 FastAPI Backend Application Configuration
 """
 import os
+from functools import cached_property
 from pathlib import Path
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -28,6 +29,11 @@ class Settings(BaseSettings):
     MONGO_USER: str = "visionpro"
     MONGO_PASS: str = "visionpro_secret"
     MONGO_DB: str = "visionpro"
+    MONGO_MAX_POOL_SIZE: int = 200
+    MONGO_MIN_POOL_SIZE: int = 20
+    # Read preference for read-heavy collections (events, recordings).
+    # Set to "secondary_preferred" when MongoDB runs as a replica set.
+    MONGO_HOT_READ_PREFERENCE: str = "primary"
 
     @property
     def MONGO_URI(self) -> str:
@@ -47,6 +53,11 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24
 
+    # --- Password hashing (Argon2id) ---
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 65536  # KiB
+    ARGON2_PARALLELISM: int = 4
+
     # --- Storage Paths ---
     RECORDING_PATH: str = str(BASE_DIR / "recordings")
     MODELS_PATH: str = str(BASE_DIR / "models")
@@ -78,31 +89,33 @@ class Settings(BaseSettings):
         import os
         return os.path.exists("/etc/nv_tegra_release")
 
-    @property
+    # Storage directories are created on first access and then cached, so hot
+    # paths (snapshots, clips) don't pay a stat+mkdir on every lookup.
+    @cached_property
     def RECORDING_DIR(self) -> Path:
         path = Path(self.RECORDING_PATH)
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    @property
+    @cached_property
     def MODELS_DIR(self) -> Path:
         path = Path(self.MODELS_PATH)
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    @property
+    @cached_property
     def YOLO_MODELS_DIR(self) -> Path:
         path = self.MODELS_DIR / "yolo"
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    @property
+    @cached_property
     def SNAPSHOT_DIR(self) -> Path:
         path = Path(self.SNAPSHOT_PATH)
         path.mkdir(parents=True, exist_ok=True)
         return path
 
-    @property
+    @cached_property
     def FACE_MODELS_DIR(self) -> Path:
         path = self.MODELS_DIR / "faces"
         path.mkdir(parents=True, exist_ok=True)
@@ -2,11 +2,21 @@
 GPU detection and management utilities.
 """
 import logging
+import time
 from dataclasses import dataclass
 from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# NVML is initialised once per process; device handles are cached.
+_nvml_inited = False
+_nvml_unavailable = False  # set after a failed init so non-GPU hosts don't retry
+_handles: list = []
+
+# Coalesce dashboard polls — NVML counters only refresh every ~50-100ms anyway
+_GPU_INFO_TTL = 1.0
+_gpu_info_cache: tuple[float, list] = (0.0, [])
+
 
 @dataclass
 class GPUInfo:
@@ -21,40 +31,65 @@ class GPUInfo:
     temperature: float
 
 
-def is_gpu_available() -> bool:
-    """Check if NVIDIA GPU is available."""
+def init_nvml() -> bool:
+    """Initialise NVML and cache device handles. Safe to call repeatedly."""
+    global _nvml_inited, _nvml_unavailable, _handles
+    if _nvml_inited:
+        return True
+    if _nvml_unavailable:
+        return False
     try:
         import pynvml
         pynvml.nvmlInit()
-        count = pynvml.nvmlDeviceGetCount()
-        pynvml.nvmlShutdown()
-        return count > 0
-    except Exception:
-        return False
+        _handles = [
+            pynvml.nvmlDeviceGetHandleByIndex(i)
+            for i in range(pynvml.nvmlDeviceGetCount())
+        ]
+        _nvml_inited = True
+    except Exception as e:
+        logger.debug(f"NVML unavailable: {e}")
+        _nvml_unavailable = True
+        _handles = []
+    return _nvml_inited
 
 
-def get_gpu_count() -> int:
-    """Get number of available GPUs."""
+def shutdown_nvml() -> None:
+    """Release NVML at process shutdown."""
+    global _nvml_inited, _handles
+    if not _nvml_inited:
+        return
     try:
         import pynvml
-        pynvml.nvmlInit()
-        count = pynvml.nvmlDeviceGetCount()
         pynvml.nvmlShutdown()
-        return count
     except Exception:
-        return 0
+        pass
+    _nvml_inited = False
+    _handles = []
+
+
+def is_gpu_available() -> bool:
+    """Check if NVIDIA GPU is available."""
+    return init_nvml() and len(_handles) > 0
+
+
+def get_gpu_count() -> int:
+    """Get number of available GPUs."""
+    return len(_handles) if init_nvml() else 0
 
 
 def get_gpu_info() -> list[GPUInfo]:
     """Get detailed info for all GPUs."""
+    global _gpu_info_cache
+    fetched_at, cached = _gpu_info_cache
+    if time.monotonic() - fetched_at < _GPU_INFO_TTL:
+        return cached
+
     gpus = []
+    if not init_nvml():
+        return gpus
     try:
         import pynvml
-        pynvml.nvmlInit()
-        count = pynvml.nvmlDeviceGetCount()
-
-        for i in range(count):
-            handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+        for i, handle in enumerate(_handles):
             name = pynvml.nvmlDeviceGetName(handle)
             if isinstance(name, bytes):
                 name = name.decode("utf-8")
@@ -79,11 +114,10 @@ def get_gpu_info() -> list[GPUInfo]:
                 memory_utilization=util.memory,
                 temperature=temp,
             ))
-
-        pynvml.nvmlShutdown()
     except Exception as e:
         logger.warning(f"Could not read GPU info: {e}")
 
+    _gpu_info_cache = (time.monotonic(), gpus)
     return gpus
 
 
@@ -0,0 +1,23 @@
+"""
+ObjectId parsing for ids that arrive in paths and request bodies.
+"""
+import re
+
+from bson import ObjectId
+from fastapi import HTTPException, status
+
+_OBJECT_ID_RE = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def parse_object_id(value: str, kind: str = "object") -> ObjectId:
+    """Parse a client-supplied id, rejecting malformed ones with 400.
+
+    bson raises InvalidId for bad input, which would otherwise surface as a
+    500; ``kind`` names the resource in the error ("Invalid camera id").
+    """
+    if not _OBJECT_ID_RE.fullmatch(value):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {kind} id",
+        )
+    return ObjectId(value)
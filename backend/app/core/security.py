@@ -1,48 +1,91 @@
 """
 Security utilities – JWT auth, password hashing, credential encryption.
 """
+import base64
+import binascii
+import functools
+import hashlib
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import bcrypt
+from bson import Binary
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from cryptography.fernet import Fernet
-from jose import JWTError, jwt
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.config import settings
+from app.core.ttl_cache import TTLCache
 from app.database import users_collection
 
 # JWT Bearer scheme
 security_scheme = HTTPBearer()
 
-# Credential encryption key (derived from SECRET_KEY)
-_fernet_key: Fernet | None = None
+# Password hashing — new hashes are Argon2id; bcrypt hashes are still verified.
+# Hashing is deliberately slow; route handlers call it via asyncio.to_thread.
+_password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+_ARGON2_PREFIX = "$argon2"
 
+# Credential encryption key (derived from SECRET_KEY), built once at import.
+# New values are AES-256-GCM; Fernet is kept only to read legacy values.
+_credential_key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+_aead = AESGCM(_credential_key)
+_fernet = Fernet(base64.urlsafe_b64encode(_credential_key))
 
-def _get_fernet() -> Fernet:
-    """Get or create Fernet encryption instance."""
-    global _fernet_key
-    if _fernet_key is None:
-        import hashlib, base64
-        key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
-        _fernet_key = Fernet(base64.urlsafe_b64encode(key))
-    return _fernet_key
+_AESGCM_PREFIX = "aesgcm:"           # text form of an AES-GCM credential
+_CREDENTIAL_SUBTYPE = 0x80           # BSON user-defined binary subtype
+_FERNET_PREFIX = "gAAAAA"
+_NONCE_SIZE = 12
+_TAG_SIZE = 16                       # GCM authentication tag
+
+# JWT signing key and accepted algorithms, resolved once
+_JWT_KEY = settings.SECRET_KEY.encode()
+_JWT_ALGORITHM = settings.JWT_ALGORITHM
+_JWT_ALGS = [_JWT_ALGORITHM]
+
+# Validated JWT payloads: sha256(token)[:16] -> payload. Entries are only
+# trusted until the token's own "exp" claim; failed tokens are never cached.
+_token_cache = TTLCache(ttl=settings.JWT_EXPIRATION_HOURS * 3600, maxsize=10000)
+
+# User documents resolved by get_current_user: username -> doc
+_user_cache = TTLCache(ttl=30.0, maxsize=1024)
 
 
 # ----- Password -----
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    """Hash a password using Argon2id."""
+    return _password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
+    """Verify a password against its hash (Argon2id or legacy bcrypt)."""
+    if hashed_password.startswith(_ARGON2_PREFIX):
+        try:
+            return _password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            return False
     return bcrypt.checkpw(
         plain_password.encode("utf-8"), hashed_password.encode("utf-8")
     )
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a stored hash is legacy bcrypt or uses outdated Argon2 params."""
+    if not hashed_password.startswith(_ARGON2_PREFIX):
+        return True
+    return _password_hasher.check_needs_rehash(hashed_password)
+
+
 # ----- JWT -----
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
@@ -51,22 +94,37 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expires_delta or timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     )
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=_JWT_ALGORITHM)
 
 
 def decode_token(token: str) -> dict:
-    """Decode and validate a JWT token."""
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+    """Decode and validate a JWT token (cached until the token expires)."""
+    key = hashlib.sha256(token.encode()).digest()[:16]
+    payload = _token_cache.get(key)
+    if payload is not None:
         return payload
-    except JWTError:
+
+    try:
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGS)
+    except jwt.PyJWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired token",
         )
 
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        _token_cache.put(key, payload, ttl=remaining)
+    return payload
+
+
+def invalidate_user_cache(username: Optional[str] = None) -> None:
+    """Drop cached user documents (all of them when no username is given)."""
+    if username is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(username)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
@@ -79,14 +137,23 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token payload",
         )
-    user = await users_collection().find_one({"username": username})
+    cached = _user_cache.get(username)
+    if cached is not None:
+        return dict(cached)
+
+    # The password hash is never needed past login — keep it off the wire and
+    # out of the cache.
+    user = await users_collection().find_one(
+        {"username": username}, {"password_hash": 0}
+    )
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     user["_id"] = str(user["_id"])
-    return user
+    _user_cache.put(username, user)
+    return dict(user)
 
 
 async def require_admin(user: dict = Depends(get_current_user)) -> dict:
@@ -100,11 +167,55 @@ async def require_admin(user: dict = Depends(get_current_user)) -> dict:
 
 
 # ----- Credential Encryption -----
-def encrypt_credential(value: str) -> str:
-    """Encrypt a service credential for database storage."""
-    return _get_fernet().encrypt(value.encode()).decode()
-
-
-def decrypt_credential(encrypted_value: str) -> str:
-    """Decrypt a service credential from database storage."""
-    return _get_fernet().decrypt(encrypted_value.encode()).decode()
+def is_encrypted_credential(value) -> bool:
+    """Check whether a stored settings value is an encrypted credential."""
+    if isinstance(value, Binary):
+        return value.subtype == _CREDENTIAL_SUBTYPE
+    return isinstance(value, str) and value.startswith((_AESGCM_PREFIX, _FERNET_PREFIX))
+
+
+def encrypt_credential(value: str) -> Binary:
+    """Encrypt a service credential for database storage (raw BSON binary)."""
+    nonce = os.urandom(_NONCE_SIZE)
+    ciphertext = _aead.encrypt(nonce, value.encode(), None)
+    return Binary(nonce + ciphertext, _CREDENTIAL_SUBTYPE)
+
+
+def credential_to_text(value):
+    """Render a stored credential as text for API responses; other values pass through."""
+    if isinstance(value, Binary) and value.subtype == _CREDENTIAL_SUBTYPE:
+        return _AESGCM_PREFIX + base64.urlsafe_b64encode(bytes(value)).decode()
+    return value
+
+
+def credential_from_text(value: str):
+    """Inverse of credential_to_text() for ciphertexts echoed back by clients."""
+    if value.startswith(_AESGCM_PREFIX):
+        try:
+            raw = base64.urlsafe_b64decode(value[len(_AESGCM_PREFIX):])
+        except (binascii.Error, ValueError):
+            raw = b""
+        if len(raw) < _NONCE_SIZE + _TAG_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Malformed encrypted credential",
+            )
+        return Binary(raw, _CREDENTIAL_SUBTYPE)
+    return value
+
+
+@functools.lru_cache(maxsize=256)
+def decrypt_credential(encrypted_value) -> str:
+    """Decrypt a service credential from database storage.
+
+    Accepts BSON binary values as well as the older text forms. Results are
+    memoised per ciphertext; call ``decrypt_credential.cache_clear()`` when
+    credentials are rewritten.
+    """
+    if isinstance(encrypted_value, Binary):
+        raw = bytes(encrypted_value)
+    elif encrypted_value.startswith(_AESGCM_PREFIX):
+        raw = base64.urlsafe_b64decode(encrypted_value[len(_AESGCM_PREFIX):])
+    else:
+        return _fernet.decrypt(encrypted_value.encode()).decode()
+    return _aead.decrypt(raw[:_NONCE_SIZE], raw[_NONCE_SIZE:], None).decode()
@@ -0,0 +1,45 @@
+"""
+Small in-process TTL cache shared by the route and auth caches.
+"""
+import time
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Dict of key -> value that forgets entries after ``ttl`` seconds.
+
+    Holds at most ``maxsize`` entries: when full, expired entries are swept
+    first and then the oldest insertion is evicted. Not thread-safe; callers
+    use it from the event loop only.
+    """
+
+    def __init__(self, ttl: float, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        hit = self._data.get(key)
+        if hit is None:
+            return None
+        if hit[0] <= time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return hit[1]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        """Store ``value`` and return it; ``ttl`` overrides the default lifetime."""
+        now = time.monotonic()
+        if key not in self._data and len(self._data) >= self.maxsize:
+            for k in [k for k, (exp, _) in self._data.items() if exp <= now]:
+                del self._data[k]
+            if len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+        self._data[key] = (now + (self.ttl if ttl is None else ttl), value)
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
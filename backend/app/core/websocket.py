@@ -3,78 +3,103 @@ WebSocket connection manager for live streaming.
 """
 import asyncio
 import logging
-from typing import Dict, Set
+from typing import Dict, Iterable, Tuple
+
+import orjson
 from fastapi import WebSocket
 
 logger = logging.getLogger(__name__)
 
+# A client that cannot take a message within this window is treated as dead,
+# so a stalled socket cannot hold up the broadcast loop for everyone else.
+_SEND_TIMEOUT = 1.0
+
 
 class ConnectionManager:
     """Manages WebSocket connections for live camera feeds and system updates."""
 
     def __init__(self):
-        # channel -> set of connected websockets
-        self._connections: Dict[str, Set[WebSocket]] = {}
+        # channel -> immutable tuple of connected websockets. Tuples are
+        # replaced (never mutated) under the lock, so broadcasts can read
+        # the current snapshot without locking.
+        self._connections: Dict[str, Tuple[WebSocket, ...]] = {}
         self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket, channel: str) -> None:
         """Accept and register a WebSocket connection to a channel."""
         await websocket.accept()
         async with self._lock:
-            if channel not in self._connections:
-                self._connections[channel] = set()
-            self._connections[channel].add(websocket)
+            current = self._connections.get(channel, ())
+            if websocket not in current:
+                self._connections[channel] = current + (websocket,)
         logger.debug(f"WebSocket connected to channel: {channel}")
 
     async def disconnect(self, websocket: WebSocket, channel: str) -> None:
         """Remove a WebSocket connection from a channel."""
-        async with self._lock:
-            if channel in self._connections:
-                self._connections[channel].discard(websocket)
-                if not self._connections[channel]:
-                    del self._connections[channel]
+        await self._remove(channel, (websocket,))
         logger.debug(f"WebSocket disconnected from channel: {channel}")
 
-    async def broadcast_to_channel(self, channel: str, data: dict) -> None:
-        """Send JSON data to all connections on a channel."""
+    async def _remove(self, channel: str, sockets: Iterable[WebSocket]) -> None:
+        """Rebuild a channel's tuple without the given sockets."""
         async with self._lock:
-            connections = self._connections.get(channel, set()).copy()
+            current = self._connections.get(channel)
+            if current is None:
+                return
+            remaining = tuple(ws for ws in current if ws not in sockets)
+            if remaining:
+                self._connections[channel] = remaining
+            else:
+                del self._connections[channel]
 
-        dead = []
-        for ws in connections:
-            try:
-                await ws.send_json(data)
-            except Exception:
-                dead.append(ws)
+    async def broadcast_to_channel(self, channel: str, data: dict) -> None:
+        """Send JSON data to all connections on a channel."""
+        connections = self._connections.get(channel, ())
+        if not connections:
+            return
 
-        # Clean up dead connections
-        if dead:
-            async with self._lock:
-                for ws in dead:
-                    if channel in self._connections:
-                        self._connections[channel].discard(ws)
+        # Serialize once for every subscriber; sent as a text frame so the
+        # frontend can keep using JSON.parse(event.data).
+        payload = orjson.dumps(data).decode()
+        await self._fan_out(
+            channel, connections, [ws.send_text(payload) for ws in connections]
+        )
 
     async def broadcast_bytes(self, channel: str, data: bytes) -> None:
         """Send binary data (e.g., JPEG frames) to all connections on a channel."""
-        async with self._lock:
-            connections = self._connections.get(channel, set()).copy()
-
-        dead = []
-        for ws in connections:
-            try:
-                await ws.send_bytes(data)
-            except Exception:
-                dead.append(ws)
-
+        connections = self._connections.get(channel, ())
+        if not connections:
+            return
+
+        await self._fan_out(
+            channel, connections, [ws.send_bytes(data) for ws in connections]
+        )
+
+    async def _fan_out(self, channel: str, connections: Tuple[WebSocket, ...], sends: list) -> None:
+        """Run all sends concurrently, dropping clients that error or time out."""
+        results = await asyncio.gather(
+            *(asyncio.wait_for(send, _SEND_TIMEOUT) for send in sends),
+            return_exceptions=True,
+        )
+
+        # Clean up dead connections (rare — only takes the lock on failure)
+        dead = [ws for ws, r in zip(connections, results) if isinstance(r, BaseException)]
         if dead:
-            async with self._lock:
-                for ws in dead:
-                    if channel in self._connections:
-                        self._connections[channel].discard(ws)
+            await self._remove(channel, dead)
+            # A timed-out socket may still be open; close it so the client
+            # notices and reconnects instead of silently getting nothing.
+            # Closed concurrently, so N stalled clients cost one timeout.
+            await asyncio.gather(
+                *(
+                    asyncio.wait_for(ws.close(), _SEND_TIMEOUT)
+                    for ws, r in zip(connections, results)
+                    if isinstance(r, asyncio.TimeoutError)
+                ),
+                return_exceptions=True,
+            )
 
     def get_channel_count(self, channel: str) -> int:
         """Get number of connections on a channel."""
-        return len(self._connections.get(channel, set()))
+        return len(self._connections.get(channel, ()))
 
     def get_all_channels(self) -> list[str]:
         """Get all active channels."""
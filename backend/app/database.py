@@ -3,25 +3,37 @@ MongoDB connection manager using Motor (async driver).
 """
 import logging
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReadPreference
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 _client: AsyncIOMotorClient | None = None
 _database: AsyncIOMotorDatabase | None = None
+_hot_read_preference = ReadPreference.PRIMARY
 
 
 async def connect_db() -> None:
     """Initialize MongoDB connection."""
-    global _client, _database
+    global _client, _database, _hot_read_preference
     try:
         _client = AsyncIOMotorClient(
             settings.MONGO_URI,
-            maxPoolSize=50,
-            minPoolSize=5,
-            serverSelectionTimeoutMS=5000,
+            maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+            maxIdleTimeMS=60000,
+            waitQueueTimeoutMS=1000,
+            serverSelectionTimeoutMS=1500,
+            retryReads=True,
+            # Negotiated with the server; unavailable codecs are skipped
+            compressors="zstd,snappy,zlib",
         )
         _database = _client[settings.MONGO_DB]
+        _hot_read_preference = getattr(
+            ReadPreference,
+            settings.MONGO_HOT_READ_PREFERENCE.upper(),
+            ReadPreference.PRIMARY,
+        )
         # Verify connection
         await _client.admin.command("ping")
         logger.info(
@@ -32,6 +44,56 @@ async def connect_db() -> None:
         raise
 
 
+async def ensure_indexes() -> None:
+    """Create indexes backing hot-path lookups (idempotent)."""
+    # Unique keys enforce what signup/create_camera used to check with a
+    # find_one before inserting, so startup must not continue without them.
+    # Deployments that already hold duplicates have to remove or rename them
+    # first, e.g. find them with
+    #   db.users.aggregate([{$group: {_id: "$email", n: {$sum: 1}}}, {$match: {n: {$gt: 1}}}])
+    for collection, field in (
+        (users_collection(), "username"),
+        (users_collection(), "email"),
+        (cameras_collection(), "name"),
+    ):
+        try:
+            await collection.create_index(field, unique=True)
+        except Exception as e:
+            logger.error(
+                f"❌ Could not create unique {collection.name}.{field} index: {e} — "
+                f"remove duplicate {field} values from {collection.name} and restart"
+            )
+            raise
+    try:
+        # Analytics $match on a timestamp range; list/count filter on equality
+        # fields and sort by timestamp (equality keys first, timestamp last).
+        await events_collection().create_indexes([
+            IndexModel([("timestamp", DESCENDING), ("event_type", ASCENDING)]),
+            IndexModel([("camera_id", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel([("event_type", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel([("face_id", ASCENDING), ("timestamp", DESCENDING)]),
+            IndexModel([("camera_id", ASCENDING), ("event_type", ASCENDING), ("timestamp", DESCENDING)]),
+        ])
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create events indexes: {e}")
+    try:
+        # Playback lists recordings newest-first, optionally per camera, and
+        # the calendar matches one camera over a start_time range
+        await recordings_collection().create_indexes([
+            IndexModel([("camera_id", ASCENDING), ("start_time", DESCENDING)]),
+            IndexModel([("start_time", DESCENDING)]),
+        ])
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create recordings indexes: {e}")
+    try:
+        # Settings are read per category and upserted per (category, key)
+        await settings_collection().create_index(
+            [("category", ASCENDING), ("key", ASCENDING)], unique=True
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not create settings index: {e}")
+
+
 async def disconnect_db() -> None:
     """Close MongoDB connection."""
     global _client, _database
@@ -61,7 +123,7 @@ def cameras_collection():
 
 
 def events_collection():
-    return get_collection("events")
+    return get_database().get_collection("events", read_preference=_hot_read_preference)
 
 
 def faces_collection():
@@ -69,7 +131,7 @@ def faces_collection():
 
 
 def recordings_collection():
-    return get_collection("recordings")
+    return get_database().get_collection("recordings", read_preference=_hot_read_preference)
 
 
 def settings_collection():
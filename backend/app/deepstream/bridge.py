@@ -2,32 +2,36 @@
 ZMQ Bridge — DeepStream side (PUSH publisher).
 
 Runs inside the DeepStream container. Receives decoded frames + NvDs detection
-metadata from GStreamer pad probes and publishes them as msgpack messages over a
-ZMQ PUSH socket to the FastAPI backend.
+metadata from GStreamer pad probes and publishes them as multipart messages over
+a ZMQ PUSH socket to the FastAPI backend. The first part is always a msgpack
+header; bulk data travels as raw parts so it is never copied into msgpack.
 
-Message schema (msgpack):
+"frame"      → [header, JPEG bytes]
+"detection"  → [header, DET_DTYPE array bytes, snapshot JPEG bytes (may be empty)]
+
+Header schema (msgpack):
 {
-    "type":        "detection" | "frame",
-    "camera_id":   str,
-    "timestamp":   float,          # Unix timestamp
-    "jpeg":        bytes | None,   # JPEG-encoded frame (present in "frame" msgs)
-    "detections": [                # present in "detection" msgs
-        {
-            "class_id":    int,
-            "class_name":  str,
-            "confidence":  float,
-            "bbox":        [left, top, width, height],  # pixels, absolute
-            "track_id":    int | None,
-        }
-    ]
+    "type":         "detection" | "frame",
+    "camera_id":    str,
+    "timestamp":    float,         # Unix timestamp
+    "class_names":  [str],         # "detection" only — indexed by name_idx
+    "frame_width":  int,           # "detection" only
+    "frame_height": int,           # "detection" only
 }
+
+Detections are a packed NumPy structured array (see DET_DTYPE); bbox is
+[left, top, width, height] in absolute pixels. unpack_detections() turns it
+back into the dict list used by the event pipeline.
 """
 import logging
+import threading
 import time
+from collections import deque
 from typing import Optional
 
+import numpy as np
 import zmq
-import msgpack
+import msgspec
 
 logger = logging.getLogger(__name__)
 
@@ -61,53 +65,192 @@ EVENT_CLASS_MAP = {
 }
 
 
+# One record per detection. Class names are per-model (custom models share the
+# global id space via class offsets), so they travel once per message in the
+# header and each row carries an index into that list.
+# Confidence and bbox are fixed-point: confidence × CONF_SCALE (1e-4 steps)
+# and pixels × BBOX_SCALE (1/8 px steps, up to ±4095 px — covers 4K frames).
+DET_DTYPE = np.dtype([
+    ("class_id",   "<u2"),
+    ("name_idx",   "<u2"),
+    ("confidence", "<u2"),
+    ("bbox",       "<i2", (4,)),
+    ("track_id",   "<u8"),
+])
+CONF_SCALE = 10000
+BBOX_SCALE = 8
+UNTRACKED_ID = 0xFFFFFFFFFFFFFFFF  # NvDs object_id when no tracker is attached
+
+
+def pack_detections(
+    class_ids: np.ndarray,
+    confidences: np.ndarray,
+    bboxes: np.ndarray,
+    track_ids: np.ndarray,
+    class_names: list,
+) -> tuple[np.ndarray, list]:
+    """
+    Pack parallel detection arrays into a DET_DTYPE array plus the list of
+    class names its name_idx refers to. `class_names` maps global class ids
+    to names (ids past its end become "class_<id>").
+    """
+    arr = np.empty(len(class_ids), dtype=DET_DTYPE)
+    used, name_idx = np.unique(class_ids, return_inverse=True)
+    arr["class_id"]   = class_ids
+    arr["name_idx"]   = name_idx
+    arr["confidence"] = np.rint(np.asarray(confidences) * CONF_SCALE)
+    arr["bbox"]       = np.clip(np.rint(np.asarray(bboxes) * BBOX_SCALE), -32768, 32767)
+    arr["track_id"]   = track_ids
+    names = [
+        class_names[c] if c < len(class_names) else f"class_{c}"
+        for c in used.tolist()
+    ]
+    return arr, names
+
+
+def unpack_detections(buf, class_names: list) -> list:
+    """Decode a DET_DTYPE buffer into the detection dicts used downstream."""
+    arr = np.frombuffer(buf, dtype=DET_DTYPE)
+    # Resolve event types once per distinct class, not once per detection
+    event_types = [EVENT_CLASS_MAP.get(name, "custom") for name in class_names]
+    out = []
+    for cid, idx, conf, bbox, tid in zip(
+        arr["class_id"].tolist(),
+        arr["name_idx"].tolist(),
+        (arr["confidence"] / CONF_SCALE).round(4).tolist(),
+        (arr["bbox"] / BBOX_SCALE).round(1).tolist(),
+        arr["track_id"].tolist(),
+    ):
+        out.append({
+            "class_id":   cid,
+            "class_name": class_names[idx],
+            "event_type": event_types[idx],
+            "confidence": conf,
+            "bbox":       bbox,
+            "track_id":   None if tid == UNTRACKED_ID else tid,
+        })
+    return out
+
+
+# "type" is emitted as a msgspec tag, so the receiver can decode either
+# header straight into its typed Struct.
+class FrameHeader(msgspec.Struct, tag_field="type", tag="frame"):
+    """Header part of a live-view frame; the JPEG travels as the next part."""
+    camera_id: str
+    timestamp: float
+
+
+class DetectionHeader(msgspec.Struct, tag_field="type", tag="detection"):
+    """Header part of a detection message; the DET_DTYPE array and snapshot follow."""
+    camera_id: str
+    timestamp: float
+    class_names: list
+    frame_width: int
+    frame_height: int
+
+
 class DeepStreamBridge:
-    """ZMQ PUSH publisher — sends frames and detections to FastAPI."""
+    """ZMQ PUSH publisher — sends frames and detections to FastAPI.
+
+    Publishers are called from several GStreamer streaming threads, but ZMQ
+    sockets are not thread-safe, so messages are queued and a single sender
+    thread owns the socket and drains the queue in batches.
+    """
+
+    _QUEUE_MAX = 256      # messages buffered before the oldest is dropped
+    _BATCH_MAX = 32       # messages sent per wake-up
+    _POLL_MS = 5          # wait for socket writability before dropping a batch
 
     def __init__(self, zmq_endpoint: str = "tcp://*:5570"):
         self._ctx = zmq.Context()
         self._sock = self._ctx.socket(zmq.PUSH)
-        self._sock.setsockopt(zmq.SNDHWM, 60)       # drop oldest if slow consumer
+        self._sock.setsockopt(zmq.SNDHWM, 256)      # absorb short consumer pauses
+        self._sock.setsockopt(zmq.SNDBUF, 4 * 1024 * 1024)  # ~16 cams of JPEG bursts
+        self._sock.setsockopt(zmq.IMMEDIATE, 1)     # don't queue for half-open peers
+        self._sock.setsockopt(zmq.TCP_KEEPALIVE, 1)
+        if hasattr(zmq, "TCP_MAXRT"):
+            self._sock.setsockopt(zmq.TCP_MAXRT, 5000)  # ms — bound retransmits on a dead peer
         self._sock.setsockopt(zmq.LINGER, 0)
         self._sock.bind(zmq_endpoint)
+        # Structs encode as a msgpack map (with the "type" tag included)
+        self._enc = msgspec.msgpack.Encoder()
+
+        self._queue: deque = deque(maxlen=self._QUEUE_MAX)
+        self._wake = threading.Event()
+        self._running = True
+        self._sender = threading.Thread(
+            target=self._send_loop, name="zmq-bridge-sender", daemon=True
+        )
+        self._sender.start()
         logger.info(f"🔗 DeepStream ZMQ bridge bound to {zmq_endpoint}")
 
+    def _enqueue(self, parts: list) -> None:
+        self._queue.append(parts)  # deque(maxlen) drops the oldest when full
+        self._wake.set()
+
+    def _send_loop(self) -> None:
+        """Sender thread: the only code that touches the socket after bind."""
+        poller = zmq.Poller()
+        poller.register(self._sock, zmq.POLLOUT)
+        while self._running:
+            self._wake.wait(timeout=0.1)
+            self._wake.clear()
+            while self._queue and self._running:
+                if not poller.poll(self._POLL_MS):
+                    # Consumer is slow — drop this batch rather than build latency
+                    for _ in range(min(self._BATCH_MAX, len(self._queue))):
+                        self._queue.popleft()
+                    continue
+                for _ in range(min(self._BATCH_MAX, len(self._queue))):
+                    parts = self._queue.popleft()
+                    try:
+                        self._sock.send_multipart(
+                            parts, flags=zmq.NOBLOCK, copy=False, track=False
+                        )
+                    except zmq.Again:
+                        break  # HWM reached — message dropped
+                    except zmq.ZMQError as e:
+                        logger.warning(f"ZMQ send failed: {e}")
+                        break
+
     def publish_frame(self, camera_id: str, jpeg: bytes) -> None:
         """Send a JPEG frame to FastAPI for WebSocket broadcast."""
-        msg = {
-            "type":      "frame",
-            "camera_id": camera_id,
-            "timestamp": time.time(),
-            "jpeg":      jpeg,
-        }
-        try:
-            self._sock.send(msgpack.packb(msg, use_bin_type=True), zmq.NOBLOCK)
-        except zmq.Again:
-            pass  # Consumer is slow — drop frame rather than block pipeline
+        header = self._enc.encode(FrameHeader(
+            camera_id=camera_id,
+            timestamp=time.time(),
+        ))
+        self._enqueue([header, jpeg])
 
     def publish_detections(
         self,
         camera_id: str,
-        detections: list,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        bboxes: np.ndarray,
+        track_ids: np.ndarray,
+        class_names: list,
         jpeg: Optional[bytes] = None,
         frame_width: int = 1920,
         frame_height: int = 1080,
     ) -> None:
-        """Send detection metadata (+ optional snapshot jpeg) to FastAPI."""
-        msg = {
-            "type":         "detection",
-            "camera_id":    camera_id,
-            "timestamp":    time.time(),
-            "detections":   detections,
-            "jpeg":         jpeg,
-            "frame_width":  frame_width,
-            "frame_height": frame_height,
-        }
-        try:
-            self._sock.send(msgpack.packb(msg, use_bin_type=True), zmq.NOBLOCK)
-        except zmq.Again:
-            pass
+        """
+        Send one frame's detections (+ optional snapshot jpeg) to FastAPI.
+
+        Detections are parallel arrays — see pack_detections().
+        """
+        dets, names = pack_detections(class_ids, confidences, bboxes, track_ids, class_names)
+        header = self._enc.encode(DetectionHeader(
+            camera_id=camera_id,
+            timestamp=time.time(),
+            class_names=names,
+            frame_width=frame_width,
+            frame_height=frame_height,
+        ))
+        self._enqueue([header, dets.view(np.uint8), jpeg or b""])
 
     def close(self) -> None:
+        self._running = False
+        self._wake.set()
+        self._sender.join(timeout=1.0)
         self._sock.close()
         self._ctx.term()
@@ -22,6 +22,7 @@ DEFAULT_PT   = os.environ.get("YOLO_PT_PATH",    "/models/yolo/yolov8n.pt")
 DEFAULT_ONNX = os.environ.get("ONNX_MODEL_PATH", "/models/onnx/yolov8n.onnx")
 DEFAULT_ENG  = os.environ.get("TRT_ENGINE_PATH",  "/models/yolo/yolov8n.engine")
 TRT_WORKSPACE_GB = int(os.environ.get("TRT_WORKSPACE_GB", "2"))
+MAX_BATCH = int(os.environ.get("DS_MAX_BATCH", "16"))
 
 
 def convert_pt_to_onnx(
@@ -74,6 +75,7 @@ def convert_pt_to_onnx(
         imgsz=imgsz,
         opset=opset,
         simplify=simplify,
+        dynamic=True,  # dynamic batch axis for the shared, batched nvinfer
     )
 
     # Move to the requested output path if ultralytics wrote it elsewhere
@@ -144,6 +146,9 @@ def convert_onnx_to_engine(
             f"--onnx={onnx_path}",
             f"--saveEngine={engine_path}",
             f"--memPoolSize=workspace:{workspace_gb}G",
+            "--minShapes=images:1x3x640x640",
+            f"--optShapes=images:{MAX_BATCH}x3x640x640",
+            f"--maxShapes=images:{MAX_BATCH}x3x640x640",
         ]
         if fp16:
             cmd.append("--fp16")
@@ -176,6 +181,8 @@ def convert_onnx_to_engine(
                 format="engine",
                 imgsz=640,
                 half=fp16,
+                dynamic=True,
+                batch=MAX_BATCH,
                 device=0,
                 workspace=workspace_gb,
                 verbose=False,
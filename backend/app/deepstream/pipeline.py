@@ -1,36 +1,32 @@
 """
 DeepStream GStreamer Pipeline — runs INSIDE the DeepStream Docker container.
 
-Creates one pipeline per camera:
-  rtspsrc → rtph264depay → h264parse → nvv4l2decoder (GPU)
-           → nvvideoconvert → capsfilter
-           → tee ─┬─ nvinfer (TensorRT YOLO) → nvtracker → probe → ZMQ detections
-                  └─ nvvideoconvert → jpegenc → appsink  → ZMQ frames
+Creates one pipeline for all cameras:
+  per camera: rtspsrc → rtph264depay → h264parse → nvv4l2decoder (GPU)
+              → nvvideoconvert → capsfilter
+              → tee ─┬─ queue → nvstreammux sink_<i>
+                     └─ videorate → nvvideoconvert → nvjpegenc → appsink → ZMQ frames
+  shared:     nvstreammux (batch-size=N) → nvinfer (TensorRT YOLO, batched)
+              → leaky queue → probe → ZMQ detections
 
 Detection metadata is extracted via GStreamer pad probes using pyds.
-JPEG frames are captured via appsink for WebSocket broadcast.
+JPEG frames are encoded on the GPU (nvjpegenc, NVMM input) and captured via
+appsink for WebSocket broadcast — no CPU-side encode is involved.
 """
+from __future__ import annotations
+
 import os
 import sys
 import logging
 import threading
 import time
-import io
 import ctypes
 from typing import Dict, Optional
 
-import gi
-gi.require_version("Gst", "1.0")
-gi.require_version("GstApp", "1.0")
-from gi.repository import Gst, GstApp, GLib
-
-import pyds
 import numpy as np
-from PIL import Image
-import msgpack
 
-from app.deepstream.bridge import DeepStreamBridge, COCO_CLASSES, EVENT_CLASS_MAP
-from app.deepstream.trt_convert import convert_if_needed
+from app.deepstream.bridge import DeepStreamBridge, COCO_CLASSES, UNTRACKED_ID
+from app.deepstream.trt_convert import convert_if_needed, calibration_cache_path, MAX_BATCH
 from urllib.parse import urlparse, quote, urlunparse
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s")
@@ -43,12 +39,23 @@ ENGINE_PATH    = os.environ.get("TRT_ENGINE_PATH",  "/models/yolo/yolov8n.engine
 CONF_THRESHOLD = float(os.environ.get("CONF_THRESHOLD", "0.45"))
 JPEG_QUALITY   = int(os.environ.get("JPEG_QUALITY", "80"))
 TARGET_FPS     = int(os.environ.get("TARGET_FPS", "30"))
+# Live-view JPEG size; nvvideoconvert scales on the GPU before encode.
+# 0 keeps the camera's native resolution.
+PREVIEW_WIDTH  = int(os.environ.get("PREVIEW_WIDTH", "1280"))
+PREVIEW_HEIGHT = int(os.environ.get("PREVIEW_HEIGHT", "720"))
+
+# GStreamer / pyds — bound by _load_gstreamer() from main(), so the helpers in
+# this module can be imported without the DeepStream runtime present.
+Gst = None
+GLib = None
+pyds = None
 
 # Globals
 bridge: Optional[DeepStreamBridge] = None
 MODEL_CLASSES: list = []  # populated at startup from .pt model
 NUM_CLASSES: int = 80
 _latest_jpeg: Dict[str, bytes] = {}  # camera_id → most recent JPEG for snapshots
+HAS_NVJPEGENC: bool = True  # resolved in main() once GStreamer is initialised
 
 
 def detect_model_classes(pt_path: str = None) -> list:
@@ -81,8 +88,8 @@ gpu-id=0
 net-scale-factor=0.0039215697906911373
 model-engine-file={engine_path}
 {onnx_file_line}labelfile-path=/tmp/labels.txt
-batch-size=1
-network-type=100
+batch-size={batch_size}
+{precision_lines}network-type=100
 num-detected-classes={num_classes}
 interval=0
 gie-unique-id=1
@@ -97,6 +104,18 @@ detected-min-h=0
 """
 
 
+def _write_if_changed(path: str, content: str) -> None:
+    """Write `content` to `path` unless the file already holds exactly that."""
+    try:
+        with open(path) as f:
+            if f.read() == content:
+                return
+    except OSError:
+        pass
+    with open(path, "w") as f:
+        f.write(content)
+
+
 def write_nvinfer_config(engine_path: str, threshold: float, num_classes: int, class_names: list, unique_id: int = 1, onnx_path: str = "") -> str:
     """Write nvinfer config file. On Jetson, includes onnx-file for auto-rebuild."""
     config_path = f"/tmp/nvinfer_yolo_{unique_id}.txt"
@@ -112,17 +131,24 @@ def write_nvinfer_config(engine_path: str, threshold: float, num_classes: int, c
     if onnx_path and os.path.exists(onnx_path):
         onnx_file_line = f"onnx-file={onnx_path}\n"
 
+    # network-mode only matters if nvinfer has to rebuild the engine from ONNX:
+    # INT8 when a calibration cache sits next to the engine, FP16 otherwise.
+    calib_cache = calibration_cache_path(engine_path)
+    if calib_cache:
+        precision_lines = f"network-mode=1\nint8-calib-file={calib_cache}\n"
+    else:
+        precision_lines = "network-mode=2\n"
+
     # Output Tensor meta is REQUIRED for our pad probe logic to work smoothly
-    with open(config_path, "w") as f:
-        f.write(NVINFER_CONFIG_TMPL.format(
-            engine_path=engine_path,
-            threshold=threshold,
-            onnx_file_line=onnx_file_line,
-            num_classes=num_classes,
-        ).replace("gie-unique-id=1", f"gie-unique-id={unique_id}").replace("labelfile-path=/tmp/labels.txt", f"labelfile-path={l_path}"))
-        
-    with open(l_path, "w") as f:
-        f.write("\n".join(class_names))
+    _write_if_changed(config_path, NVINFER_CONFIG_TMPL.format(
+        engine_path=engine_path,
+        threshold=threshold,
+        onnx_file_line=onnx_file_line,
+        num_classes=num_classes,
+        batch_size=MAX_BATCH,
+        precision_lines=precision_lines,
+    ).replace("gie-unique-id=1", f"gie-unique-id={unique_id}").replace("labelfile-path=/tmp/labels.txt", f"labelfile-path={l_path}"))
+    _write_if_changed(l_path, "\n".join(class_names))
     return config_path
 
 
@@ -152,9 +178,12 @@ def _nms_boxes(boxes, scores, iou_threshold=0.45):
     return keep
 
 
-def parse_yolo_tensor(tensor_data: np.ndarray, conf_threshold: float, img_w: int, img_h: int, class_offset: int, model_classes: list, active_class_names: list = None):
+def parse_yolo_tensor(tensor_data: np.ndarray, conf_threshold: float, img_w: int, img_h: int, class_offset: int, allowed: Optional[np.ndarray] = None):
     """
-    Parse raw YOLO output tensor [1, (4+num_classes), num_anchors] → list of detections.
+    Parse raw YOLO output tensor [1, (4+num_classes), num_anchors] → parallel
+    arrays (class_ids, confidences, bboxes), or None when nothing passes.
+    class_ids are global (offset applied); bboxes are [left, top, width, height]
+    in image pixels. `allowed` optionally masks the model's local class ids.
 
     Ultralytics YOLOv8/v11 output format:
         Each anchor: [cx, cy, w, h, class0_conf, class1_conf, ...]
@@ -164,7 +193,6 @@ def parse_yolo_tensor(tensor_data: np.ndarray, conf_threshold: float, img_w: int
     if tensor_data.ndim == 3:
         tensor_data = tensor_data[0]
     n_vals, n_anchors = tensor_data.shape  # e.g. (19, 8400)
-    n_classes = n_vals - 4
 
     # Transpose to (8400, 19) for easier processing
     preds = tensor_data.T  # (8400, 19)
@@ -177,10 +205,12 @@ def parse_yolo_tensor(tensor_data: np.ndarray, conf_threshold: float, img_w: int
     class_ids = np.argmax(class_confs, axis=1)
     max_confs = class_confs[np.arange(n_anchors), class_ids]
 
-    # Filter by confidence
+    # Filter by confidence (and by the model's active classes)
     mask = max_confs > conf_threshold
+    if allowed is not None:
+        mask &= allowed[class_ids]
     if not mask.any():
-        return []
+        return None
 
     cx, cy, w, h = cx[mask], cy[mask], w[mask], h[mask]
     class_ids = class_ids[mask]
@@ -196,40 +226,50 @@ def parse_yolo_tensor(tensor_data: np.ndarray, conf_threshold: float, img_w: int
 
     boxes = np.stack([x1, y1, x2, y2], axis=1)
 
-    # NMS per class
-    final_dets = []
+    # NMS per class — collect surviving anchor indices
+    keep_idx = []
     for cls_id in np.unique(class_ids):
-        cls_mask = class_ids == cls_id
-        cls_boxes = boxes[cls_mask]
-        cls_scores = max_confs[cls_mask]
-        keep = _nms_boxes(cls_boxes, cls_scores, iou_threshold=0.45)
-        for k in keep:
-            bx = cls_boxes[k]
-            c_name = model_classes[int(cls_id)] if int(cls_id) < len(model_classes) else f"class_{cls_id}"
-            
-            if active_class_names is not None and c_name not in active_class_names:
-                continue
-
-            final_dets.append({
-                "class_id": global_cls_id,
-                "class_name": c_name,
-                "event_type": EVENT_CLASS_MAP.get(c_name, "custom"),
-                "confidence": round(float(cls_scores[k]), 4),
-                "bbox": [
-                    round(float(max(0, bx[0])), 1),
-                    round(float(max(0, bx[1])), 1),
-                    round(float(bx[2] - bx[0]), 1),
-                    round(float(bx[3] - bx[1]), 1),
-                ],
-                "track_id": None,
-            })
-    return final_dets
+        idx = np.flatnonzero(class_ids == cls_id)
+        keep = _nms_boxes(boxes[idx], max_confs[idx], iou_threshold=0.45)
+        keep_idx.extend(idx[keep].tolist())
+    keep_idx = np.asarray(keep_idx, dtype=np.intp)
+
+    kept = boxes[keep_idx]
+    bboxes = np.stack([
+        np.maximum(0, kept[:, 0]),
+        np.maximum(0, kept[:, 1]),
+        kept[:, 2] - kept[:, 0],
+        kept[:, 3] - kept[:, 1],
+    ], axis=1)
+    return class_ids[keep_idx] + class_offset, max_confs[keep_idx], bboxes
+
+
+def _model_config(uid: int):
+    """(class_offset, allowed-class mask) for an nvinfer unique-id."""
+    cfg = bridge.model_configs.get(uid) if bridge else None
+    if cfg is None:
+        return 0, None
+    return cfg["class_offset"], cfg.get("allowed")
+
+
+# Scratch arrays for the NvDsObjectMeta fallback, filled in place per frame.
+# The probe runs on the single shared nvinfer streaming thread, and
+# publish_detections copies them before the next frame.
+_MAX_OBJECTS = 256
+_obj_cls   = np.empty(_MAX_OBJECTS, dtype=np.int64)
+_obj_conf  = np.empty(_MAX_OBJECTS, dtype=np.float32)
+_obj_bbox  = np.empty((_MAX_OBJECTS, 4), dtype=np.float32)
+_obj_track = np.empty(_MAX_OBJECTS, dtype=np.uint64)
 
 
 # ─── Pad probe — extract raw output tensors ──────────────────────────────────
 
-def osd_sink_pad_buffer_probe(pad, info, camera_id):
-    """Extract raw YOLO tensor from nvinfer output-tensor-meta and parse detections."""
+def osd_sink_pad_buffer_probe(pad, info, source_cameras):
+    """Extract raw YOLO tensor from nvinfer output-tensor-meta and parse detections.
+
+    The buffer is a batch from the shared nvstreammux; `source_cameras` maps
+    each frame's source_id (mux sink pad index) back to its camera id.
+    """
     gst_buffer = info.get_buffer()
     if not gst_buffer:
         return Gst.PadProbeReturn.OK
@@ -245,11 +285,14 @@ def osd_sink_pad_buffer_probe(pad, info, camera_id):
         except StopIteration:
             break
 
+        camera_id = source_cameras[frame_meta.source_id]
+
         # Get image dimensions from streammux
         img_w = frame_meta.source_frame_width or 1920
         img_h = frame_meta.source_frame_height or 1080
 
-        detections = []
+        # (class_ids, confidences, bboxes, track_ids) arrays, one entry per model
+        parts = []
 
         # Try to read raw tensor output from all nvinfer engines (output-tensor-meta=1)
         l_user = frame_meta.frame_user_meta_list
@@ -258,18 +301,7 @@ def osd_sink_pad_buffer_probe(pad, info, camera_id):
                 user_meta = pyds.NvDsUserMeta.cast(l_user.data)
                 if user_meta.base_meta.meta_type == pyds.NvDsMetaType.NVDSINFER_TENSOR_OUTPUT_META:
                     tensor_meta = pyds.NvDsInferTensorMeta.cast(user_meta.user_meta_data)
-                    uid = tensor_meta.unique_id
-                    
-                    # Ensure we have class definitions for this model
-                    if hasattr(bridge, "model_configs") and uid in bridge.model_configs:
-                        cfg = bridge.model_configs[uid]
-                        class_offset = cfg["class_offset"]
-                        model_classes = cfg["class_names"]
-                        active_class_names = cfg.get("active_class_names")
-                    else:
-                        class_offset = 0
-                        model_classes = MODEL_CLASSES
-                        active_class_names = None
+                    class_offset, allowed = _model_config(tensor_meta.unique_id)
 
                     # Get first output layer
                     layer = pyds.get_nvds_LayerInfo(tensor_meta, 0)
@@ -280,9 +312,11 @@ def osd_sink_pad_buffer_probe(pad, info, camera_id):
                     for d in dims:
                         total *= d
                     arr = np.ctypeslib.as_array(ptr, shape=(total,)).reshape(dims).copy()
-                    
-                    new_dets = parse_yolo_tensor(arr, CONF_THRESHOLD, img_w, img_h, class_offset, model_classes, active_class_names)
-                    detections.extend(new_dets)
+
+                    parsed = parse_yolo_tensor(arr, CONF_THRESHOLD, img_w, img_h, class_offset, allowed)
+                    if parsed is not None:
+                        cls, conf, bbox = parsed
+                        parts.append((cls, conf, bbox, np.full(len(cls), UNTRACKED_ID, dtype=np.uint64)))
             except Exception as e:
                 logger.debug(f"Tensor parse error: {e}")
 
@@ -292,57 +326,38 @@ def osd_sink_pad_buffer_probe(pad, info, camera_id):
                 break
 
         # Fallback: also check NvDsObjectMeta (works if parser is available inside TensorRT engine)
-        if not detections:
+        if not parts:
+            n = 0
             l_obj = frame_meta.obj_meta_list
-            while l_obj:
+            while l_obj and n < _MAX_OBJECTS:
                 try:
                     obj_meta = pyds.NvDsObjectMeta.cast(l_obj.data)
-                    uid = obj_meta.unique_component_id
-
-                    # Map global class ID and name
-                    if hasattr(bridge, "model_configs") and uid in bridge.model_configs:
-                        cfg = bridge.model_configs[uid]
-                        class_offset = cfg["class_offset"]
-                        model_classes = cfg["class_names"]
-                        active_class_names = cfg.get("active_class_names")
-                    else:
-                        class_offset = 0
-                        model_classes = MODEL_CLASSES
-                        active_class_names = None
-
-                    local_class_id = obj_meta.class_id
-                    global_class_id = local_class_id + class_offset
-                    class_name = model_classes[local_class_id] if local_class_id < len(model_classes) else f"class_{local_class_id}"
-                    
-                    if active_class_names is not None and class_name not in active_class_names:
-                        continue
-                        
-                    conf = obj_meta.confidence
-                    rect = obj_meta.rect_params
-                    detections.append({
-                        "class_id":   global_class_id,
-                        "class_name": class_name,
-                        "event_type": EVENT_CLASS_MAP.get(class_name, "custom"),
-                        "confidence": round(float(conf), 4),
-                        "bbox":       [
-                            round(float(rect.left), 1),
-                            round(float(rect.top), 1),
-                            round(float(rect.width), 1),
-                            round(float(rect.height), 1),
-                        ],
-                        "track_id":  obj_meta.object_id if obj_meta.object_id != 0xFFFFFFFFFFFFFFFF else None,
-                    })
                 except StopIteration:
                     break
+                class_offset, allowed = _model_config(obj_meta.unique_component_id)
+                local_class_id = obj_meta.class_id
+                if allowed is None or (local_class_id < len(allowed) and allowed[local_class_id]):
+                    rect = obj_meta.rect_params
+                    _obj_cls[n]   = local_class_id + class_offset
+                    _obj_conf[n]  = obj_meta.confidence
+                    _obj_bbox[n]  = (rect.left, rect.top, rect.width, rect.height)
+                    _obj_track[n] = obj_meta.object_id  # UNTRACKED_ID when no tracker
+                    n += 1
                 try:
                     l_obj = l_obj.next
                 except StopIteration:
                     break
+            if n:
+                parts.append((_obj_cls[:n], _obj_conf[:n], _obj_bbox[:n], _obj_track[:n]))
 
-        if detections and bridge:
+        if parts and bridge:
+            if len(parts) == 1:
+                cls, conf, bbox, track = parts[0]
+            else:
+                cls, conf, bbox, track = (np.concatenate(col) for col in zip(*parts))
             jpeg = _latest_jpeg.get(camera_id)
-            bridge.publish_detections(camera_id, detections, jpeg=jpeg,
-                                     frame_width=img_w, frame_height=img_h)
+            bridge.publish_detections(camera_id, cls, conf, bbox, track, MODEL_CLASSES,
+                                      jpeg=jpeg, frame_width=img_w, frame_height=img_h)
 
         try:
             l_frame = l_frame.next
@@ -361,38 +376,23 @@ def on_new_sample(appsink, camera_id: str):
         return Gst.FlowReturn.ERROR
 
     buf = sample.get_buffer()
-    success, map_info = buf.map(Gst.MapFlags.READ)
-    if not success:
-        return Gst.FlowReturn.ERROR
-
     try:
-        # buf already contains the JPEG payload from nvjpegenc
-        jpeg = bytes(map_info.data)
+        # buf already contains the encoded JPEG — one copy straight into bytes
+        jpeg = buf.extract_dup(0, buf.get_size())
         _latest_jpeg[camera_id] = jpeg  # cache for detection snapshots
         if bridge:
             bridge.publish_frame(camera_id, jpeg)
     except Exception as e:
         logger.warning(f"Frame publish error: {e}")
-    finally:
-        buf.unmap(map_info)
 
     return Gst.FlowReturn.OK
 
 
 # ─── Build pipeline ──────────────────────────────────────────────────────────
 
-def build_pipeline(camera_id: str, rtsp_url: str, configs: list) -> Gst.Pipeline:
-    """Build a GStreamer DeepStream pipeline for one camera.
-    Supports chaining multiple nvinfer elements when configs list length > 1.
-    """
-    pipeline = Gst.Pipeline()
-
-    def make(factory, name):
-        el = Gst.ElementFactory.make(factory, name)
-        if not el:
-            raise RuntimeError(f"Failed to create GStreamer element: {factory}")
-        return el
-
+def _build_source_branch(pipeline: Gst.Pipeline, make, camera_id: str, rtsp_url: str,
+                         streammux, index: int) -> None:
+    """Per-camera decode chain: feeds mux sink_<index> and its own JPEG appsink."""
     safe_id = camera_id.replace("-", "_")
 
     # Source
@@ -404,36 +404,30 @@ def build_pipeline(camera_id: str, rtsp_url: str, configs: list) -> Gst.Pipeline
     caps1    = make("capsfilter",     f"caps1_{safe_id}")
     caps1.set_property("caps", Gst.Caps.from_string("video/x-raw(memory:NVMM),format=NV12"))
 
-    # nvstreammux — REQUIRED by nvinfer to generate NvDsBatchMeta
-    streammux = make("nvstreammux",   f"mux_{safe_id}")
-    streammux.set_property("batch-size", 1)
-    streammux.set_property("width", 1920)
-    streammux.set_property("height", 1080)
-    streammux.set_property("batched-push-timeout", 40000)  # 40ms = 25fps max
-    streammux.set_property("live-source", True)
-
     # Tee — split decoded stream to inference and JPEG encode
     tee      = make("tee",            f"tee_{safe_id}")
 
-    # Branch 1 — inference (no tracker with network-type=100)
+    # Branch 1 — into the shared batch
     queue1   = make("queue",          f"q_inf_{safe_id}")
-    
-    # Create N nvinfer elements sequentially
-    infers = []
-    for idx, cfg in enumerate(configs, 1):
-        infer = make("nvinfer", f"nvinfer_{safe_id}_{idx}")
-        infer.set_property("config-file-path", cfg["config_path"])
-        infer.set_property("unique-id", idx)
-        infers.append(infer)
-        
-    fakesink = make("fakesink",       f"fsink_{safe_id}")
 
     # Branch 2 — JPEG for WebSocket (Hardware Accelerated)
     queue2   = make("queue",          f"q_jpeg_{safe_id}")
+    # Cap the preview rate before conversion/encode — dropped frames cost nothing
+    rate     = make("videorate",      f"rate_jpeg_{safe_id}")
+    rate.set_property("drop-only", True)
+    rate.set_property("max-rate", TARGET_FPS)
     conv2    = make("nvvideoconvert", f"conv_jpeg_{safe_id}")
     caps2    = make("capsfilter",     f"caps2_{safe_id}")
-    caps2.set_property("caps", Gst.Caps.from_string("video/x-raw(memory:NVMM),format=I420"))
-    jpegenc  = make("nvjpegenc",      f"jpegenc_{safe_id}")
+    preview_size = ""
+    if PREVIEW_WIDTH and PREVIEW_HEIGHT:
+        preview_size = f",width={PREVIEW_WIDTH},height={PREVIEW_HEIGHT}"
+    if HAS_NVJPEGENC:
+        caps2.set_property("caps", Gst.Caps.from_string(f"video/x-raw(memory:NVMM),format=I420{preview_size}"))
+        jpegenc = make("nvjpegenc",   f"jpegenc_{safe_id}")
+    else:
+        # No NVJPEG plugin — download the (already scaled) I420 and encode on the CPU
+        caps2.set_property("caps", Gst.Caps.from_string(f"video/x-raw,format=I420{preview_size}"))
+        jpegenc = make("jpegenc",     f"jpegenc_{safe_id}")
     jpegenc.set_property("quality", JPEG_QUALITY)
     appsink  = make("appsink",        f"appsink_{safe_id}")
 
@@ -449,19 +443,14 @@ def build_pipeline(camera_id: str, rtsp_url: str, configs: list) -> Gst.Pipeline
     src.set_property("drop-on-latency", False)
     src.set_property("buffer-mode", 0)
 
-    fakesink.set_property("sync", False)
-    fakesink.set_property("async", False)
-
     appsink.set_property("emit-signals", True)
     appsink.set_property("sync", False)
     appsink.set_property("max-buffers", 2)
     appsink.set_property("drop", True)
     appsink.connect("new-sample", on_new_sample, camera_id)
 
-    # Add all to pipeline
     for el in [src, depay, parse, decoder, conv1, caps1, tee,
-               queue1, streammux, fakesink,
-               queue2, conv2, caps2, jpegenc, appsink] + infers:
+               queue1, queue2, rate, conv2, caps2, jpegenc, appsink]:
         pipeline.add(el)
 
     # Handle dynamic rtspsrc → depay pad
@@ -479,38 +468,90 @@ def build_pipeline(camera_id: str, rtsp_url: str, configs: list) -> Gst.Pipeline
     conv1.link(caps1)
     caps1.link(tee)
 
-    # Tee → branch 1 (inference via streammux)
-    tee_src1 = tee.get_request_pad("src_%u")
-    queue1_sink = queue1.get_static_pad("sink")
-    tee_src1.link(queue1_sink)
-
-    # queue1 → streammux (pad request) → [nvinfer_1 → nvinfer_2 → ...] → fakesink
-    mux_sinkpad = streammux.request_pad_simple("sink_0")
+    # Tee → branch 1: queue1 → streammux sink_<index>
+    tee.get_request_pad("src_%u").link(queue1.get_static_pad("sink"))
+    mux_sinkpad = streammux.request_pad_simple(f"sink_{index}")
     if not mux_sinkpad:
-        mux_sinkpad = streammux.get_request_pad("sink_0")
-    queue1_src = queue1.get_static_pad("src")
-    queue1_src.link(mux_sinkpad)
-
-    # Chain streammux -> infer1 -> infer2 -> ... -> fakesink
-    prev_element = streammux
-    for infer in infers:
-        prev_element.link(infer)
-        prev_element = infer
-    prev_element.link(fakesink)
+        mux_sinkpad = streammux.get_request_pad(f"sink_{index}")
+    queue1.get_static_pad("src").link(mux_sinkpad)
 
     # Tee → branch 2 (JPEG)
-    tee_src2 = tee.get_request_pad("src_%u")
-    queue2_sink = queue2.get_static_pad("sink")
-    tee_src2.link(queue2_sink)
-    queue2.link(conv2)
+    tee.get_request_pad("src_%u").link(queue2.get_static_pad("sink"))
+    queue2.link(rate)
+    rate.link(conv2)
     conv2.link(caps2)
     caps2.link(jpegenc)
     jpegenc.link(appsink)
 
-    # Add pad probe on the LAST nvinfer src pad for raw tensor detection metadata
-    # The last element has accumulated metadatas from all previous nvinfer elements
-    last_infer_src = infers[-1].get_static_pad("src")
-    last_infer_src.add_probe(Gst.PadProbeType.BUFFER, osd_sink_pad_buffer_probe, camera_id)
+
+def build_pipeline(cameras: list, configs: list) -> Gst.Pipeline:
+    """Build one DeepStream pipeline for all cameras.
+
+    Every camera's decoded frames are batched by a single nvstreammux and run
+    through one chain of nvinfer elements (one per model), so TensorRT sees
+    batch-N instead of N batch-1 engines. JPEG encoding stays per camera,
+    branched off before the mux.
+    """
+    pipeline = Gst.Pipeline()
+
+    def make(factory, name):
+        el = Gst.ElementFactory.make(factory, name)
+        if not el:
+            raise RuntimeError(f"Failed to create GStreamer element: {factory}")
+        return el
+
+    batch_size = max(1, min(len(cameras), MAX_BATCH))
+
+    # nvstreammux — REQUIRED by nvinfer to generate NvDsBatchMeta
+    streammux = make("nvstreammux", "mux")
+    streammux.set_property("batch-size", batch_size)
+    streammux.set_property("width", 1920)
+    streammux.set_property("height", 1080)
+    streammux.set_property("batched-push-timeout", 40000)  # 40ms = 25fps max
+    streammux.set_property("live-source", True)
+
+    # Create N nvinfer elements sequentially
+    infers = []
+    for idx, cfg in enumerate(configs, 1):
+        infer = make("nvinfer", f"nvinfer_{idx}")
+        infer.set_property("config-file-path", cfg["config_path"])
+        infer.set_property("unique-id", idx)
+        infer.set_property("batch-size", batch_size)
+        infers.append(infer)
+
+    # Leaky queue after inference — the detection probe runs on this queue's
+    # thread, so a slow probe drops stale batches instead of stalling nvinfer
+    q_probe = make("queue", "q_probe")
+    q_probe.set_property("leaky", 2)  # downstream — drop oldest
+    q_probe.set_property("max-size-buffers", 2)
+    q_probe.set_property("max-size-bytes", 0)
+    q_probe.set_property("max-size-time", 0)
+
+    fakesink = make("fakesink", "fsink")
+    fakesink.set_property("sync", False)
+    fakesink.set_property("async", False)
+
+    for el in [streammux, q_probe, fakesink] + infers:
+        pipeline.add(el)
+
+    source_cameras = []
+    for index, cam in enumerate(cameras):
+        _build_source_branch(pipeline, make, cam["id"], cam["rtsp_url"], streammux, index)
+        source_cameras.append(cam["id"])
+
+    # Chain streammux -> infer1 -> infer2 -> ... -> q_probe -> fakesink
+    prev_element = streammux
+    for infer in infers:
+        prev_element.link(infer)
+        prev_element = infer
+    prev_element.link(q_probe)
+    q_probe.link(fakesink)
+
+    # Probe after the LAST nvinfer (via q_probe) for raw tensor detection metadata
+    # The buffer has accumulated metadatas from all nvinfer elements
+    q_probe.get_static_pad("src").add_probe(
+        Gst.PadProbeType.BUFFER, osd_sink_pad_buffer_probe, source_cameras
+    )
 
     return pipeline
 
@@ -537,23 +578,52 @@ def sanitize_rtsp_url(url: str) -> str:
     return url
 
 
+_mongo_client = None
+_cameras_indexed = False
+
+
+def _get_mongo_client():
+    """Process-wide MongoClient, created on first use and kept open."""
+    global _mongo_client
+    if _mongo_client is None:
+        from pymongo import MongoClient
+        _mongo_client = MongoClient(MONGO_URI, maxPoolSize=4, serverSelectionTimeoutMS=2000)
+    return _mongo_client
+
+
 def load_cameras_from_mongo() -> list:
     """Load enabled cameras from MongoDB at startup."""
-    from pymongo import MongoClient
-    client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-    db = client["visionpro"]
-    cameras = list(db["cameras"].find({"enabled": True}, {"_id": 1, "rtsp_url": 1, "name": 1}))
-    client.close()
+    global _cameras_indexed
+    cameras_coll = _get_mongo_client()["visionpro"]["cameras"]
+    if not _cameras_indexed:
+        cameras_coll.create_index("enabled")
+        _cameras_indexed = True
+    cameras = list(cameras_coll.find({"enabled": True}, {"_id": 1, "rtsp_url": 1, "name": 1}))
     return [{"id": str(c["_id"]), "rtsp_url": sanitize_rtsp_url(c["rtsp_url"]), "name": c["name"]} for c in cameras]
 
 
 
 # ─── Main ───────────────────────────────────────────────────────────────────
 
+def _load_gstreamer() -> None:
+    """Import GObject introspection + pyds (slow; only needed to run pipelines)."""
+    global Gst, GLib, pyds
+    import gi
+    gi.require_version("Gst", "1.0")
+    gi.require_version("GstApp", "1.0")
+    from gi.repository import Gst as _Gst, GstApp, GLib as _GLib  # noqa: F401
+    import pyds as _pyds
+    Gst, GLib, pyds = _Gst, _GLib, _pyds
+
+
 def main():
-    global bridge
+    global bridge, HAS_NVJPEGENC
 
+    _load_gstreamer()
     Gst.init(None)
+    HAS_NVJPEGENC = Gst.ElementFactory.find("nvjpegenc") is not None
+    if not HAS_NVJPEGENC:
+        logger.warning("⚠️ nvjpegenc not available — falling back to CPU jpegenc")
 
     # Convert model first
     logger.info("🔧 Checking TensorRT engine ...")
@@ -605,7 +675,9 @@ def main():
             bridge.model_configs[i] = {
                 "class_offset": current_class_offset, 
                 "class_names": c_names,
-                "active_class_names": active_class_names
+                "active_class_names": active_class_names,
+                # Boolean mask over local class ids, applied before NMS
+                "allowed": np.isin(c_names, list(active_class_names)),
             }
             
             MODEL_CLASSES.extend(c_names)
@@ -631,9 +703,6 @@ def main():
     NUM_CLASSES = len(MODEL_CLASSES)
     # ----------------------------------------------------
 
-    # Connect ZMQ bridge
-    bridge = DeepStreamBridge(ZMQ_ENDPOINT)
-
     # Load cameras
     logger.info("📋 Loading cameras from MongoDB ...")
     cameras = load_cameras_from_mongo()
@@ -643,23 +712,23 @@ def main():
         time.sleep(60)
         return
 
-    logger.info(f"📷 Starting pipelines for {len(cameras)} camera(s) ...")
+    logger.info(f"📷 Starting batched pipeline for {len(cameras)} camera(s) ...")
+    for cam in cameras:
+        logger.info(f"  → {cam['name']} ({cam['id']}): {cam['rtsp_url']}")
 
     pipelines = []
     loop = GLib.MainLoop()
 
-    for cam in cameras:
-        logger.info(f"  → {cam['name']} ({cam['id']}): {cam['rtsp_url']}")
-        try:
-            p = build_pipeline(cam["id"], cam["rtsp_url"], active_configs)
-            ret = p.set_state(Gst.State.PLAYING)
-            if ret == Gst.StateChangeReturn.FAILURE:
-                logger.error(f"❌ Pipeline failed to start for camera {cam['id']}")
-            else:
-                logger.info(f"✅ Pipeline PLAYING: {cam['name']}")
-                pipelines.append(p)
-        except Exception as e:
-            logger.error(f"❌ Failed to build pipeline for {cam['id']}: {e}")
+    try:
+        p = build_pipeline(cameras, active_configs)
+        ret = p.set_state(Gst.State.PLAYING)
+        if ret == Gst.StateChangeReturn.FAILURE:
+            logger.error("❌ Batched pipeline failed to start")
+        else:
+            logger.info(f"✅ Pipeline PLAYING: {len(cameras)} camera(s)")
+            pipelines.append(p)
+    except Exception as e:
+        logger.error(f"❌ Failed to build batched pipeline: {e}")
 
     def on_message(bus, message, loop):
         t = message.type
@@ -2,7 +2,8 @@
 ZMQ Receiver — FastAPI side (PULL subscriber).
 
 Runs as an asyncio background task inside the FastAPI process.
-Receives msgpack messages from the DeepStream container and:
+Receives multipart messages (msgpack header + raw parts) from the DeepStream
+container and:
   - "frame"     → broadcast JPEG to ws_manager (feeds Dashboard live feeds)
   - "detection" → route through existing event creation pipeline (events, faces, notifications)
 
@@ -10,18 +11,26 @@ This replaces the OpenCV capture + PyTorch YOLO path when DEEPSTREAM_ENABLED=Tru
 """
 import asyncio
 import logging
-import time
 from typing import Optional
 
 import zmq
 import zmq.asyncio
-import msgpack
+import msgspec
 
 from app.config import settings
+from app.deepstream.bridge import FrameHeader, DetectionHeader, unpack_detections
 from app.core.websocket import ws_manager
 
 logger = logging.getLogger(__name__)
 
+DETECTION_QUEUE_SIZE = 512
+DETECTION_WORKERS = 4
+POLL_TIMEOUT_MS = 500
+MAX_DRAIN = 64  # messages handled per wake-up before yielding to the loop
+
+# Headers decode straight into typed Structs, dispatched on their "type" tag
+_header_decoder = msgspec.msgpack.Decoder(FrameHeader | DetectionHeader)
+
 
 class DeepStreamReceiver:
     """Async ZMQ PULL socket consumer — bridge between DeepStream and FastAPI."""
@@ -32,6 +41,10 @@ class DeepStreamReceiver:
         self._task: Optional[asyncio.Task]         = None
         self._running = False
         self._latest_frames: dict[str, bytes] = {}  # camera_id → latest JPEG
+        # Detections are handed to a fixed pool of workers instead of one task
+        # per message; when the queue is full the oldest entry is dropped.
+        self._det_q: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
 
     def get_snapshot(self, camera_id: str) -> Optional[bytes]:
         """Return the most recent JPEG frame for a camera (for snapshot endpoints)."""
@@ -44,20 +57,28 @@ class DeepStreamReceiver:
         self._ctx  = zmq.asyncio.Context()
         self._sock = self._ctx.socket(zmq.PULL)
         self._sock.setsockopt(zmq.RCVHWM, 120)
+        self._sock.setsockopt(zmq.RCVBUF, 4 * 1024 * 1024)
         self._sock.setsockopt(zmq.LINGER, 0)
         endpoint = f"tcp://{settings.DEEPSTREAM_HOST}:{settings.DEEPSTREAM_ZMQ_PORT}"
         self._sock.connect(endpoint)
         logger.info(f"🔗 DeepStream receiver connected to {endpoint}")
+        self._det_q = asyncio.Queue(maxsize=DETECTION_QUEUE_SIZE)
+        self._workers = [
+            asyncio.create_task(self._det_worker(), name=f"deepstream_det_{i}")
+            for i in range(DETECTION_WORKERS)
+        ]
         self._task = asyncio.create_task(self._recv_loop(), name="deepstream_receiver")
 
     async def stop(self) -> None:
         self._running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for task in [self._task, *self._workers]:
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._workers = []
         if self._sock:
             self._sock.close()
         if self._ctx:
@@ -65,50 +86,72 @@ class DeepStreamReceiver:
         logger.info("🛑 DeepStream receiver stopped")
 
     async def _recv_loop(self) -> None:
-        """Main receive loop — dispatches incoming messages."""
+        """Main receive loop — waits for readiness, then drains ready messages."""
         logger.info("📡 DeepStream receiver loop started")
+        poller = zmq.asyncio.Poller()
+        poller.register(self._sock, zmq.POLLIN)
         while self._running:
             try:
-                raw = await asyncio.wait_for(self._sock.recv(), timeout=2.0)
-                msg = msgpack.unpackb(raw, raw=False)
-                msg_type  = msg.get("type")
-                camera_id = msg.get("camera_id", "")
-
-                if msg_type == "frame":
-                    jpeg = msg.get("jpeg")
-                    if jpeg:
-                        self._latest_frames[camera_id] = jpeg  # cache for snapshots
-                        channel = f"camera:{camera_id}"
-                        await ws_manager.broadcast_bytes(channel, jpeg)
-
-                elif msg_type == "detection":
-                    detections   = msg.get("detections", [])
-                    jpeg         = msg.get("jpeg")
-                    timestamp    = msg.get("timestamp", time.time())
-                    frame_width  = msg.get("frame_width", 1920)
-                    frame_height = msg.get("frame_height", 1080)
-                    if detections:
-                        # Broadcast detections to frontend via WebSocket
-                        det_channel = f"detections:{camera_id}"
-                        await ws_manager.broadcast_to_channel(det_channel, {
-                            "camera_id": camera_id,
-                            "detections": detections,
-                            "timestamp": timestamp,
-                        })
-                        # Route through event pipeline
-                        asyncio.create_task(
-                            self._handle_detections(camera_id, detections, jpeg,
-                                                    timestamp, frame_width, frame_height)
-                        )
-
-            except asyncio.TimeoutError:
-                continue  # No message — keep looping
+                # Timeout only bounds how long a stop() can go unnoticed
+                if not await poller.poll(POLL_TIMEOUT_MS):
+                    continue
+                for _ in range(MAX_DRAIN):
+                    try:
+                        parts = await self._sock.recv_multipart(flags=zmq.NOBLOCK, copy=False)
+                    except zmq.Again:
+                        break
+                    await self._dispatch(parts)
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.warning(f"DeepStream receiver error: {e}")
                 await asyncio.sleep(0.5)
 
+    async def _dispatch(self, parts: list) -> None:
+        """Handle one multipart message from the bridge."""
+        header = _header_decoder.decode(parts[0].buffer)
+        camera_id = header.camera_id
+
+        if type(header) is FrameHeader:
+            # JPEG arrives as its own ZMQ part after the header
+            jpeg = parts[1].bytes if len(parts) > 1 else None
+            if jpeg:
+                self._latest_frames[camera_id] = jpeg  # cache for snapshots
+                channel = f"camera:{camera_id}"
+                await ws_manager.broadcast_bytes(channel, jpeg)
+            return
+
+        detections = unpack_detections(parts[1].buffer, header.class_names)
+        if not detections:
+            return
+        jpeg = parts[2].bytes if len(parts) > 2 and len(parts[2]) else None
+
+        # Broadcast detections to frontend via WebSocket
+        det_channel = f"detections:{camera_id}"
+        await ws_manager.broadcast_to_channel(det_channel, {
+            "camera_id": camera_id,
+            "detections": detections,
+            "timestamp": header.timestamp,
+        })
+        # Route through event pipeline
+        item = (camera_id, detections, jpeg,
+                header.timestamp, header.frame_width, header.frame_height)
+        try:
+            self._det_q.put_nowait(item)
+        except asyncio.QueueFull:
+            self._det_q.get_nowait()  # drop the stalest detection
+            self._det_q.task_done()
+            self._det_q.put_nowait(item)
+
+    async def _det_worker(self) -> None:
+        """Persistent consumer of the detection queue."""
+        while True:
+            item = await self._det_q.get()
+            try:
+                await self._handle_detections(*item)
+            finally:
+                self._det_q.task_done()
+
     async def _handle_detections(
         self,
         camera_id: str,
@@ -1,7 +1,8 @@
 """
 TensorRT model conversion — runs inside the DeepStream container at startup.
 
-On x86 dGPU:  yolov8n.pt → yolov8n.engine (direct, via ultralytics)
+On x86 dGPU:  yolov8n.pt → yolov8n.engine (direct, via ultralytics; INT8 when
+              CALIB_DIR holds calibration frames, FP16 otherwise)
 On Jetson:    yolov8n.pt → yolov8n.onnx → yolov8n.engine (via onnx_convert)
 """
 import os
@@ -12,6 +13,14 @@ logger = logging.getLogger(__name__)
 
 MODEL_PT   = os.environ.get("YOLO_PT_PATH", "/models/yolo/yolov8n.pt")
 ENGINE_OUT = os.environ.get("TRT_ENGINE_PATH", "/models/yolo/yolov8n.engine")
+# Largest batch the engine is built for — all cameras share one nvinfer
+MAX_BATCH  = int(os.environ.get("DS_MAX_BATCH", "16"))
+# Directory of representative frames (e.g. snapshots/) for INT8 calibration.
+# When unset or empty the engine is built FP16.
+CALIB_DIR  = os.environ.get("CALIB_DIR", "")
+CALIB_MAX_IMAGES = 500
+
+_IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
 
 
 def _is_jetson() -> bool:
@@ -21,28 +30,104 @@ def _is_jetson() -> bool:
     return os.path.exists("/etc/nv_tegra_release")
 
 
-def convert_if_needed() -> str:
-    """Convert .pt → .engine if the engine file doesn't exist yet.
+def _calibration_yaml() -> str:
+    """Write an ultralytics dataset YAML over CALIB_DIR, or "" if there is no data."""
+    if not CALIB_DIR or not os.path.isdir(CALIB_DIR):
+        return ""
+    images = sorted(
+        f for f in os.listdir(CALIB_DIR) if f.lower().endswith(_IMAGE_EXTS)
+    )[:CALIB_MAX_IMAGES]
+    if not images:
+        return ""
+
+    list_path = "/tmp/int8_calib_images.txt"
+    with open(list_path, "w") as f:
+        f.write("\n".join(os.path.join(CALIB_DIR, name) for name in images))
+    yaml_path = "/tmp/int8_calib.yaml"
+    with open(yaml_path, "w") as f:
+        # Labels are not needed for calibration — only the image list is read
+        f.write(f"train: {list_path}\nval: {list_path}\nnames:\n  0: object\n")
+    logger.info(f"🎯 INT8 calibration set: {len(images)} images from {CALIB_DIR}")
+    return yaml_path
+
+
+def calibration_cache_path(engine_path: str = ENGINE_OUT) -> str:
+    """Calibration cache written next to an INT8 engine, or "" when absent."""
+    cache = os.path.splitext(engine_path)[0] + ".cache"
+    return cache if os.path.exists(cache) else ""
+
+
+def build_stamp_path(engine_path: str = ENGINE_OUT) -> str:
+    """Sidecar file recording the batch size and precision an engine was built with."""
+    return os.path.splitext(engine_path)[0] + ".build"
 
-    Automatically routes through ONNX on Jetson platforms.
+
+def _build_stamp(precision: str) -> str:
+    return f"batch={MAX_BATCH} precision={precision}\n"
+
+
+def _engine_is_current(engine_path: str, precision: str) -> bool:
+    """True when the engine exists and its stamp matches the wanted build.
+
+    Engines from before batched inference have no stamp (they are static
+    batch-1) and are rebuilt, as are engines built for another DS_MAX_BATCH.
     """
-    if os.path.exists(ENGINE_OUT):
-        logger.info(f"✅ TensorRT engine already exists: {ENGINE_OUT}")
-        return ENGINE_OUT
+    if not os.path.exists(engine_path):
+        return False
+    try:
+        with open(build_stamp_path(engine_path)) as f:
+            stamp = f.read()
+    except OSError:
+        stamp = ""
+    if stamp == _build_stamp(precision):
+        return True
+    logger.warning(
+        f"♻️  {engine_path} was not built for batch={MAX_BATCH} {precision} "
+        f"(stamp: {stamp.strip() or 'none'}) — rebuilding"
+    )
+    os.remove(engine_path)
+    stale_cache = calibration_cache_path(engine_path)
+    if stale_cache:
+        os.remove(stale_cache)
+    return False
+
+
+def _write_build_stamp(engine_path: str, precision: str) -> None:
+    with open(build_stamp_path(engine_path), "w") as f:
+        f.write(_build_stamp(precision))
+
+
+def convert_if_needed() -> str:
+    """Convert .pt → .engine unless an engine with the right build already exists.
 
+    An existing engine is reused only if its build stamp matches the current
+    DS_MAX_BATCH and precision; otherwise it is rebuilt. Automatically routes
+    through ONNX on Jetson platforms.
+    """
     # ── Jetson path: PT → ONNX → Engine ─────────────────────────────────
     if _is_jetson():
+        if _engine_is_current(ENGINE_OUT, "fp16"):
+            logger.info(f"✅ TensorRT engine already exists: {ENGINE_OUT}")
+            return ENGINE_OUT
         logger.info("🔧 Jetson platform detected — using ONNX conversion pipeline")
         from app.deepstream.onnx_convert import convert_if_needed_jetson
         onnx_path = os.environ.get(
             "ONNX_MODEL_PATH",
             MODEL_PT.replace(".pt", ".onnx").replace("/yolo/", "/onnx/"),
         )
-        return convert_if_needed_jetson(
+        engine = convert_if_needed_jetson(
             pt_path=MODEL_PT,
             onnx_path=onnx_path,
             engine_path=ENGINE_OUT,
         )
+        _write_build_stamp(engine, "fp16")
+        return engine
+
+    calib_yaml = _calibration_yaml()
+    precision_name = "int8" if calib_yaml else "fp16"
+    if _engine_is_current(ENGINE_OUT, precision_name):
+        logger.info(f"✅ TensorRT engine already exists: {ENGINE_OUT}")
+        return ENGINE_OUT
 
     # ── x86 dGPU path: PT → Engine (direct) ─────────────────────────────
     if not os.path.exists(MODEL_PT):
@@ -53,23 +138,32 @@ def convert_if_needed() -> str:
             os.makedirs(os.path.dirname(MODEL_PT), exist_ok=True)
             shutil.move("yolov8n.pt", MODEL_PT)
 
-    logger.info(f"⚙️  Converting {MODEL_PT} → TensorRT engine (FP16) ...")
+    precision = {"int8": True, "data": calib_yaml} if calib_yaml else {"half": True}
+    logger.info(
+        f"⚙️  Converting {MODEL_PT} → TensorRT engine ({precision_name.upper()}) ..."
+    )
     from ultralytics import YOLO
     model = YOLO(MODEL_PT)
     model.export(
         format="engine",
         imgsz=640,
-        half=True,       # FP16 — halves VRAM, ~2× faster on Ampere+
+        dynamic=True,    # dynamic batch — one engine serves 1..MAX_BATCH cameras
+        batch=MAX_BATCH,
         device=0,
         workspace=4,     # GB for TensorRT optimization workspace
         verbose=False,
+        **precision,     # INT8 with calibration data, else FP16
     )
     # Ultralytics writes to the same dir as the .pt file
     generated = MODEL_PT.replace(".pt", ".engine")
     if generated != ENGINE_OUT:
         os.makedirs(os.path.dirname(ENGINE_OUT), exist_ok=True)
         shutil.move(generated, ENGINE_OUT)
+        generated_cache = MODEL_PT.replace(".pt", ".cache")
+        if os.path.exists(generated_cache):
+            shutil.move(generated_cache, os.path.splitext(ENGINE_OUT)[0] + ".cache")
 
+    _write_build_stamp(ENGINE_OUT, precision_name)
     logger.info(f"✅ Engine saved: {ENGINE_OUT}")
     return ENGINE_OUT
 
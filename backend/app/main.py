@@ -4,13 +4,15 @@ Vision Pro Dezine – FastAPI Application Entry Point
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
 from app.config import settings
-from app.database import connect_db, disconnect_db
+from app.database import connect_db, disconnect_db, ensure_indexes
 from app.vector_db import connect_qdrant, disconnect_qdrant
+from app.core.gpu import init_nvml, shutdown_nvml
 
 # Configure logging
 logging.basicConfig(
@@ -35,7 +37,9 @@ async def lifespan(app: FastAPI):
 
     # Connect databases
     await connect_db()
+    await ensure_indexes()
     await connect_qdrant()
+    init_nvml()
 
     # Ensure storage directories exist
     os.makedirs(settings.RECORDING_PATH, exist_ok=True)
@@ -74,8 +78,12 @@ async def lifespan(app: FastAPI):
         from app.services.stream_manager import stream_manager
         await stream_manager.stop_all()
 
+    from app.services.llm_service import llm_service
+    await llm_service.close()
+
     await disconnect_db()
     await disconnect_qdrant()
+    shutdown_nvml()
     logger.info("👋 Goodbye!")
 
 
@@ -85,6 +93,7 @@ app = FastAPI(
     description="GPU-accelerated AI-powered Network Video Recorder",
     version=settings.APP_VERSION,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
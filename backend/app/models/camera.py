@@ -3,7 +3,7 @@ Camera Pydantic models.
 """
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class DetectionConfig(BaseModel):
@@ -66,3 +66,7 @@ class CameraResponse(BaseModel):
     status: str = "offline"
     created_at: datetime
     updated_at: datetime
+
+
+# Built once — list endpoints serialize straight to JSON bytes with it
+CAMERA_LIST_ADAPTER = TypeAdapter(list[CameraResponse])
@@ -63,6 +63,15 @@ class EventResponse(BaseModel):
     created_at: datetime
 
 
+class EventListResponse(BaseModel):
+    """Paginated event list — serialized with model_dump_json()."""
+    events: list[EventResponse]
+    total: int
+    page: int
+    page_size: int
+    total_pages: int
+
+
 class EventFilter(BaseModel):
     """Query filters for events."""
     camera_id: Optional[str] = None
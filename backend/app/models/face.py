@@ -3,7 +3,7 @@ Face Pydantic models.
 """
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 
 
 class FaceCreate(BaseModel):
@@ -29,3 +29,7 @@ class FaceResponse(BaseModel):
     total_appearances: int = 0
     created_at: datetime
     updated_at: datetime
+
+
+# Built once — list endpoints serialize straight to JSON bytes with it
+FACE_LIST_ADAPTER = TypeAdapter(list[FaceResponse])
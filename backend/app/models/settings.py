@@ -3,7 +3,7 @@ Settings Pydantic models.
 """
 from datetime import datetime
 from typing import Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -35,13 +35,18 @@ class StorageSettings(BaseModel):
 
 
 # --- Notification Settings ---
+# Provider configs are read-only leaves, so they are frozen.
 class TelegramConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     bot_token: str = ""
     chat_id: str = ""
 
 
 class WhatsAppConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     api_url: str = ""
     api_key: str = ""
@@ -49,6 +54,8 @@ class WhatsAppConfig(BaseModel):
 
 
 class EmailConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     smtp_host: str = ""
     smtp_port: int = 587
@@ -59,13 +66,15 @@ class EmailConfig(BaseModel):
 
 
 class NotificationSettings(BaseModel):
-    telegram: TelegramConfig = TelegramConfig()
-    whatsapp: WhatsAppConfig = WhatsAppConfig()
-    email: EmailConfig = EmailConfig()
+    telegram: TelegramConfig = Field(default_factory=TelegramConfig)
+    whatsapp: WhatsAppConfig = Field(default_factory=WhatsAppConfig)
+    email: EmailConfig = Field(default_factory=EmailConfig)
 
 
 # --- LLM Settings ---
 class OllamaConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     base_url: str = "http://localhost:11434"
     default_model: str = ""
@@ -73,6 +82,8 @@ class OllamaConfig(BaseModel):
 
 
 class OpenAIConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     api_key: str = ""
     base_url: str = "https://api.openai.com/v1"
@@ -80,12 +91,16 @@ class OpenAIConfig(BaseModel):
 
 
 class GeminiConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     api_key: str = ""
     default_model: str = "gemini-2.0-flash"
 
 
 class OpenRouterConfig(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     enabled: bool = False
     api_key: str = ""
     default_model: str = ""
@@ -93,10 +108,10 @@ class OpenRouterConfig(BaseModel):
 
 class LLMSettings(BaseModel):
     active_provider: Optional[LLMProvider] = None
-    ollama: OllamaConfig = OllamaConfig()
-    openai: OpenAIConfig = OpenAIConfig()
-    gemini: GeminiConfig = GeminiConfig()
-    openrouter: OpenRouterConfig = OpenRouterConfig()
+    ollama: OllamaConfig = Field(default_factory=OllamaConfig)
+    openai: OpenAIConfig = Field(default_factory=OpenAIConfig)
+    gemini: GeminiConfig = Field(default_factory=GeminiConfig)
+    openrouter: OpenRouterConfig = Field(default_factory=OpenRouterConfig)
 
 
 # --- Test notification ---
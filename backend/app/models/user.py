@@ -3,7 +3,7 @@ User Pydantic models.
 """
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, TypeAdapter
 from enum import Enum
 
 
@@ -49,3 +49,7 @@ class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
+
+
+# Built once — list endpoints serialize straight to JSON bytes with it
+USER_LIST_ADAPTER = TypeAdapter(list[UserResponse])
@@ -5,7 +5,7 @@ import json
 from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
 from fastapi import APIRouter, Depends, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from app.core.security import get_current_user
 from app.services.llm_service import llm_service
 from app.database import events_collection, cameras_collection, chat_history_collection, settings_collection
@@ -347,7 +347,8 @@ async def chat(
 
     response_text = await llm_service.chat(messages)
 
-    return {
+    # Already JSON-native — encode directly instead of via jsonable_encoder
+    return ORJSONResponse({
         "response": response_text,
         "query": user_msg,
         "context": {
@@ -356,7 +357,7 @@ async def chat(
             "type_breakdown": context.get("type_breakdown", {}),
         },
         "status": "success",
-    }
+    })
 
 
 @router.post("/chat/stream")
@@ -481,7 +482,9 @@ async def get_chat_history(
             msg["context"] = doc["context"]
         messages.append(msg)
 
-    return {"messages": messages, "total": total, "page": page, "page_size": page_size}
+    return ORJSONResponse(
+        {"messages": messages, "total": total, "page": page, "page_size": page_size}
+    )
 
 
 @router.delete("/history")
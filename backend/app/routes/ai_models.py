@@ -4,47 +4,74 @@ AI model management routes.
 from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, BackgroundTasks
 from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
 import os
 import json
 import asyncio
+import contextlib
+import hashlib
 import logging
+import uuid
 import aiofiles
+import aiofiles.os
+import orjson
 
 logger = logging.getLogger(__name__)
 
 from app.database import ai_models_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user, require_admin
 from app.models.ai_model import (
-    AIModelResponse,
     ModelDownloadRequest,
     ModelUploadMeta,
     MergeModelsRequest,
+    AIModelResponse,
     AVAILABLE_YOLO_MODELS,
 )
 from app.config import settings
 
 router = APIRouter(prefix="/api/models", tags=["AI Models"])
 
+UTC = timezone.utc
+
 # Shared active-model config — written here, read by the DeepStream entrypoint
 ACTIVE_MODEL_FILE = os.path.join(settings.MODELS_PATH, "active_model.json")
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-def _model_doc_to_response(doc: dict) -> AIModelResponse:
-    return AIModelResponse(
-        id=str(doc["_id"]),
-        name=doc["name"],
-        type=doc["type"],
-        version=doc["version"],
-        file_path=doc.get("file_path", ""),
-        file_size_bytes=doc.get("file_size_bytes", 0),
-        is_default=doc.get("is_default", False),
-        is_custom=doc.get("is_custom", False),
-        metadata=doc.get("metadata", {}),
-        created_at=doc["created_at"],
-    )
+# Fields exposed by the API (mirrors AIModelResponse); model documents are
+# always inserted with all of them, so they are passed through as stored.
+_MODEL_FIELDS = {
+    "name": 1, "type": 1, "version": 1, "file_path": 1, "file_size_bytes": 1,
+    "is_default": 1, "is_custom": 1, "metadata": 1, "created_at": 1,
+}
+
+
+def _model_doc_to_response(doc: dict) -> dict:
+    """Turn a model document into its API shape in place (``_id`` -> ``id``)."""
+    doc["id"] = str(doc.pop("_id"))
+    return doc
 
 
-def _write_active_model(pt_path: str, model_name: str) -> None:
+async def _dump_active_model(data: dict) -> None:
+    """Write active_model.json without blocking the event loop.
+
+    The file is written to a uniquely named temp file next to its final path
+    and renamed into place, so readers never see a partially written file and
+    concurrent writers never share a temp file.
+    """
+    tmp_path = f"{ACTIVE_MODEL_FILE}.{uuid.uuid4().hex}.tmp"
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            await f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        await aiofiles.os.replace(tmp_path, ACTIVE_MODEL_FILE)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            await aiofiles.os.remove(tmp_path)
+        raise
+
+
+async def _write_active_model(pt_path: str, model_name: str) -> None:
     """Persist the active model selection to a shared JSON file.
 
     Includes the ONNX path so the Jetson entrypoint knows where to find/create it.
@@ -59,13 +86,12 @@ def _write_active_model(pt_path: str, model_name: str) -> None:
         "engine_path": pt_path.replace(".pt", ".engine"),
         "model_name": model_name,
         "is_merged": False,
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(UTC).isoformat(),
     }
-    with open(ACTIVE_MODEL_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await _dump_active_model(data)
 
 
-def _write_active_merged_model(model_name: str, models: list[dict], selected_classes: dict = None) -> None:
+async def _write_active_merged_model(model_name: str, models: list[dict], selected_classes: dict = None) -> None:
     """Persist the active merged model selection."""
     os.makedirs(settings.MODELS_PATH, exist_ok=True)
     onnx_dir = os.path.join(settings.MODELS_PATH, "onnx")
@@ -88,16 +114,17 @@ def _write_active_merged_model(model_name: str, models: list[dict], selected_cla
         "is_merged": True,
         "models": models_data,
         "selected_classes": selected_classes or {},
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(UTC).isoformat(),
     }
-    with open(ACTIVE_MODEL_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    await _dump_active_model(data)
 
 
-@router.get("", response_model=list[AIModelResponse])
+# Documented schema only: the handler returns plain dicts, skipping
+# response_model validation on the hot path.
+@router.get("", responses={200: {"model": list[AIModelResponse]}})
 async def list_models(user: dict = Depends(get_current_user)):
     """List all downloaded/uploaded AI models."""
-    cursor = ai_models_collection().find().sort("created_at", -1)
+    cursor = ai_models_collection().find({}, _MODEL_FIELDS).sort("created_at", -1)
     models = await cursor.to_list(length=100)
     return [_model_doc_to_response(m) for m in models]
 
@@ -108,12 +135,24 @@ async def list_available_models(user: dict = Depends(get_current_user)):
     return AVAILABLE_YOLO_MODELS
 
 
+# Parsed active_model.json, keyed by the file's (mtime_ns, size)
+_active_model_cache: dict = {"stamp": None, "data": None}
+
+
 @router.get("/active")
 async def get_active_model(user: dict = Depends(get_current_user)):
     """Return the currently active model (read from shared config file)."""
-    if os.path.exists(ACTIVE_MODEL_FILE):
-        with open(ACTIVE_MODEL_FILE) as f:
-            return json.load(f)
+    try:
+        st = os.stat(ACTIVE_MODEL_FILE)
+    except FileNotFoundError:
+        st = None
+    if st is not None:
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _active_model_cache["stamp"] != stamp:
+            with open(ACTIVE_MODEL_FILE) as f:
+                _active_model_cache["data"] = json.load(f)
+            _active_model_cache["stamp"] = stamp
+        return _active_model_cache["data"]
     # Default fallback
     onnx_dir = os.path.join(settings.MODELS_PATH, "onnx")
     return {
@@ -275,7 +314,7 @@ async def download_model(
     if existing:
         raise HTTPException(status_code=409, detail="Model already downloaded")
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     doc = {
         "name": request.model_name,
         "type": "yolo",
@@ -306,13 +345,14 @@ async def merge_models(
     admin: dict = Depends(require_admin),
 ):
     """Create a new merged model configuration from multiple existing models."""
+    # Deduplicate requested ids
+    unique_model_ids = list(set(request.model_ids))
+    object_ids = [parse_object_id(mid, "model") for mid in unique_model_ids]
+
     existing = await ai_models_collection().find_one({"name": request.name})
     if existing:
         raise HTTPException(status_code=409, detail="Model name already exists")
 
-    # Deduplicate requested ids
-    unique_model_ids = list(set(request.model_ids))
-    object_ids = [ObjectId(mid) for mid in unique_model_ids]
     cursor = ai_models_collection().find({"_id": {"$in": object_ids}})
     models = await cursor.to_list(length=len(unique_model_ids))
     
@@ -333,7 +373,7 @@ async def merge_models(
         for m in models
     ]
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     doc = {
         "name": request.name,
         "type": "merged",
@@ -361,12 +401,13 @@ async def get_model_progress(
     user: dict = Depends(get_current_user),
 ):
     """Get download/conversion progress for a model."""
-    model = await ai_models_collection().find_one({"_id": ObjectId(model_id)})
+    model_oid = parse_object_id(model_id, "model")
+    model = await ai_models_collection().find_one({"_id": model_oid})
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
     meta = model.get("metadata", {})
     return {
-        "model_id": model_id,
+        "model_id": str(model_oid),
         "name": model["name"],
         "status": meta.get("status", "unknown"),
         "progress": meta.get("progress", 0),
@@ -375,6 +416,18 @@ async def get_model_progress(
     }
 
 
+# Background worker reloads — referenced here so they aren't garbage-collected
+_reload_tasks: set[asyncio.Task] = set()
+
+
+async def _reload_worker(reload, model_name: str) -> None:
+    try:
+        await reload
+        logger.info(f"Detection worker reloaded with {model_name}")
+    except Exception as e:
+        logger.warning(f"Detection worker reload failed for {model_name}: {e}")
+
+
 @router.put("/{model_id}/default")
 async def set_default_model(
     model_id: str,
@@ -384,31 +437,27 @@ async def set_default_model(
     Set a model as the default detection model.
     Also writes active_model.json so the DeepStream container picks it up on restart.
     """
-    model = await ai_models_collection().find_one({"_id": ObjectId(model_id)})
+    model_oid = parse_object_id(model_id, "model")
+    model = await ai_models_collection().find_one({"_id": model_oid})
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    # Unset current default of same type (or YOLO if setting a merged default)
-    # Merged models act as the default YOLO model
-    target_type = model["type"] if model["type"] != "merged" else "yolo"
-    
-    await ai_models_collection().update_many(
-        {"type": {"$in": ["yolo", "merged"]}, "is_default": True},
-        {"$set": {"is_default": False}},
-    )
-
-    # Set new default
-    await ai_models_collection().update_one(
-        {"_id": ObjectId(model_id)},
-        {"$set": {"is_default": True}},
-    )
+    # Unset the current detection default (merged models act as the default
+    # YOLO model) and set the new one in a single ordered round trip
+    await ai_models_collection().bulk_write([
+        UpdateMany(
+            {"type": {"$in": ["yolo", "merged"]}, "is_default": True},
+            {"$set": {"is_default": False}},
+        ),
+        UpdateOne({"_id": model_oid}, {"$set": {"is_default": True}}),
+    ], ordered=True)
 
     # Write to shared volume config so DeepStream picks it up on restart
     onnx_converted = False
     
     if model["type"] == "merged":
         # It's a merged model
-        _write_active_merged_model(
+        await _write_active_merged_model(
             model["name"], 
             model["metadata"]["merged_models"], 
             model["metadata"].get("selected_classes")
@@ -416,7 +465,7 @@ async def set_default_model(
     else:
         # Standard model
         pt_path = model.get("file_path", str(settings.YOLO_MODELS_DIR / f"{model['name']}.pt"))
-        _write_active_model(pt_path, model["name"])
+        await _write_active_model(pt_path, model["name"])
 
         # On Jetson: trigger ONNX conversion in the background so it's ready
         # before the user restarts the DeepStream container
@@ -431,19 +480,20 @@ async def set_default_model(
             except Exception as e:
                 pass  # ONNX conversion will happen at DeepStream startup too
 
-    # Also hot-reload the standard YOLO worker if not using DeepStream
+    # Also hot-reload the standard YOLO worker if not using DeepStream. Loading
+    # weights can take seconds, so it runs in the background.
     if not settings.DEEPSTREAM_ENABLED:
-        try:
-            from app.workers.yolo_worker import detection_worker
-            if model["type"] == "merged":
-                await detection_worker.reload_merged_model(
-                    models=model["metadata"]["merged_models"],
-                    selected_classes=model["metadata"].get("selected_classes"),
-                )
-            else:
-                await detection_worker.reload_model(pt_path)
-        except Exception as e:
-            pass  # Non-critical for standard mode
+        from app.workers.yolo_worker import detection_worker
+        if model["type"] == "merged":
+            reload = detection_worker.reload_merged_model(
+                models=model["metadata"]["merged_models"],
+                selected_classes=model["metadata"].get("selected_classes"),
+            )
+        else:
+            reload = detection_worker.reload_model(pt_path)
+        task = asyncio.create_task(_reload_worker(reload, model["name"]))
+        _reload_tasks.add(task)
+        task.add_done_callback(_reload_tasks.discard)
 
     return {
         "message": f"{model['name']} set as default",
@@ -454,6 +504,18 @@ async def set_default_model(
     }
 
 
+_docker_client = None
+
+
+def _get_docker_client():
+    """Docker client for the mounted daemon socket, created on first use."""
+    global _docker_client
+    if _docker_client is None:
+        import docker  # pip install docker
+        _docker_client = docker.from_env()
+    return _docker_client
+
+
 @router.post("/deepstream/reload")
 async def reload_deepstream(admin: dict = Depends(require_admin)):
     """
@@ -463,26 +525,21 @@ async def reload_deepstream(admin: dict = Depends(require_admin)):
     if not settings.DEEPSTREAM_ENABLED:
         return {"message": "DeepStream is not enabled — using OpenCV pipeline", "status": "skipped"}
 
+    # Container name is configurable; default includes Jetson suffix when in Jetson mode
+    container_name = os.environ.get(
+        "DEEPSTREAM_CONTAINER_NAME",
+        "visionpro-deepstream-jetson" if settings.IS_JETSON else "visionpro-deepstream"
+    )
     try:
-        import docker  # pip install docker
-        client = docker.from_env()
-        # Container name is configurable; default includes Jetson suffix when in Jetson mode
-        container_name = os.environ.get(
-            "DEEPSTREAM_CONTAINER_NAME",
-            "visionpro-deepstream-jetson" if settings.IS_JETSON else "visionpro-deepstream"
-        )
-        container = client.containers.get(container_name)
-        container.restart(timeout=5)
+        client = _get_docker_client()
+        container = await asyncio.to_thread(client.containers.get, container_name)
+        await asyncio.to_thread(container.restart, timeout=5)
         return {
             "message": "DeepStream container restarting — new model will be loaded",
             "container": container.name,
             "status": "restarting",
         }
     except Exception as e:
-        container_name = os.environ.get(
-            "DEEPSTREAM_CONTAINER_NAME",
-            "visionpro-deepstream-jetson" if settings.IS_JETSON else "visionpro-deepstream"
-        )
         raise HTTPException(
             status_code=503,
             detail=(
@@ -502,12 +559,16 @@ async def upload_custom_model(
     os.makedirs(settings.YOLO_MODELS_DIR, exist_ok=True)
     filepath = str(settings.YOLO_MODELS_DIR / file.filename)
 
+    # Stream to disk — weights can be hundreds of MB; hash on the way through
+    file_size = 0
+    hasher = hashlib.sha256()
     async with aiofiles.open(filepath, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await f.write(chunk)
+            hasher.update(chunk)
+            file_size += len(chunk)
 
-    file_size = os.path.getsize(filepath)
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
 
     doc = {
         "name": name,
@@ -519,6 +580,7 @@ async def upload_custom_model(
         "is_custom": True,
         "metadata": {
             "original_filename": file.filename,
+            "sha256": hasher.hexdigest(),
             "classes": _extract_classes(filepath)
         },
         "created_at": now,
@@ -530,16 +592,20 @@ async def upload_custom_model(
 
 
 @router.delete("/{model_id}")
-async def delete_model(model_id: str, admin: dict = Depends(require_admin)):
+async def delete_model(
+    model_id: str,
+    admin: dict = Depends(require_admin),
+):
     """Delete an AI model."""
-    model = await ai_models_collection().find_one({"_id": ObjectId(model_id)})
+    model_oid = parse_object_id(model_id, "model")
+    model = await ai_models_collection().find_one({"_id": model_oid})
     if not model:
         raise HTTPException(status_code=404, detail="Model not found")
 
     if model.get("file_path") and os.path.exists(model["file_path"]):
         os.remove(model["file_path"])
 
-    await ai_models_collection().delete_one({"_id": ObjectId(model_id)})
+    await ai_models_collection().delete_one({"_id": model_oid})
     return {"message": "Model deleted successfully"}
 
 
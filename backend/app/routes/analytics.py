@@ -5,20 +5,32 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, Query
 from app.database import events_collection, cameras_collection
 from app.core.security import get_current_user
+from app.core.ttl_cache import TTLCache
 
 router = APIRouter(prefix="/api/analytics", tags=["Analytics"])
 
+UTC = timezone.utc
 
-@router.get("/overview")
-async def get_analytics_overview(
-    days: int = Query(7, ge=1, le=90),
-    user: dict = Depends(get_current_user),
-):
-    """Get analytics dashboard overview: totals by event type."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+# Aggregation results are global (not per user) and only drift slowly, so
+# they are reused for a short window.
+_analytics_cache = TTLCache(ttl=30.0, maxsize=256)
 
-    pipeline = [
-        {"$match": {"timestamp": {"$gte": cutoff}}},
+
+async def _aggregate(key: tuple, pipeline: list, length: int) -> list:
+    """Run an events aggregation, serving repeats within the TTL from memory."""
+    hit = _analytics_cache.get(key)
+    if hit is not None:
+        return hit
+
+    cursor = events_collection().aggregate(pipeline)
+    results = await cursor.to_list(length=length)
+    return _analytics_cache.put(key, results)
+
+
+# ─── Pipeline stages (shared by the single endpoints and /dashboard) ────────
+
+def _overview_stages() -> list:
+    return [
         {
             "$group": {
                 "_id": "$event_type",
@@ -28,14 +40,98 @@ async def get_analytics_overview(
         },
     ]
 
-    cursor = events_collection().aggregate(pipeline)
-    type_stats = await cursor.to_list(length=50)
 
-    total = sum(s["count"] for s in type_stats)
+def _pivot_stages(bucket_key: dict) -> list:
+    """Count events per (bucket, event type) and pivot them server-side into
+    a single ``{"trends": {bucket: {type: count}}}`` document."""
+    return [
+        {
+            "$group": {
+                "_id": {"bucket": bucket_key, "type": "$event_type"},
+                "count": {"$sum": 1},
+            }
+        },
+        {
+            "$group": {
+                "_id": "$_id.bucket",
+                "types": {"$push": {
+                    "k": {"$ifNull": ["$_id.type", "unknown"]},
+                    "v": "$count",
+                }},
+            }
+        },
+        {"$sort": {"_id": 1}},
+        {
+            "$group": {
+                "_id": None,
+                "buckets": {"$push": {
+                    "k": {"$toString": "$_id"},
+                    "v": {"$arrayToObject": "$types"},
+                }},
+            }
+        },
+        {"$project": {"_id": 0, "trends": {"$arrayToObject": "$buckets"}}},
+    ]
+
+
+def _hourly_stages() -> list:
+    """Hour of day -> {type: count}."""
+    return _pivot_stages({"$hour": "$timestamp"})
+
+
+def _daily_stages() -> list:
+    """Date (YYYY-MM-DD) -> {type: count}."""
+    return _pivot_stages({"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}})
+
 
+def _camera_stages() -> list:
+    return [
+        {
+            "$group": {
+                "_id": "$camera_id",
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"count": -1}},
+        {"$limit": 20},
+        # Join camera names server-side — one round trip instead of one per camera
+        {
+            "$lookup": {
+                "from": cameras_collection().name,
+                "let": {
+                    "cid": {"$convert": {"input": "$_id", "to": "objectId", "onError": None, "onNull": None}},
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$cid"]}}},
+                    {"$project": {"name": 1}},
+                ],
+                "as": "cam",
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "camera_id": "$_id",
+                "camera_name": {"$ifNull": [{"$first": "$cam.name"}, "$_id"]},
+                "event_count": "$count",
+            }
+        },
+    ]
+
+
+def _top_hours_stages() -> list:
+    return [
+        {"$group": {"_id": {"$hour": "$timestamp"}, "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": 5},
+    ]
+
+
+# ─── Reshaping ───────────────────────────────────────────────────────────────
+
+def _overview_from(type_stats: list) -> dict:
     return {
-        "period_days": days,
-        "total_events": total,
+        "total_events": sum(s["count"] for s in type_stats),
         "by_type": {
             s["_id"]: {"count": s["count"], "avg_confidence": round(s["avg_confidence"], 3)}
             for s in type_stats
@@ -43,6 +139,64 @@ async def get_analytics_overview(
     }
 
 
+def _trends_from(results: list) -> dict:
+    return results[0]["trends"] if results else {}
+
+
+def _top_hours_from(results: list) -> list:
+    return [{"hour": r["_id"], "count": r["count"]} for r in results]
+
+
+@router.get("/dashboard")
+async def get_analytics_dashboard(
+    days: int = Query(7, ge=1, le=90),
+    user: dict = Depends(get_current_user),
+):
+    """Everything the analytics page shows, from one pass over the matched events."""
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": cutoff}}},
+        # Only these fields feed the facets; keep the rest out of the buffer
+        {"$project": {"_id": 0, "timestamp": 1, "event_type": 1, "camera_id": 1, "confidence": 1}},
+        {
+            "$facet": {
+                "overview": _overview_stages(),
+                "hourly": _hourly_stages(),
+                "daily": _daily_stages(),
+                "cameras": _camera_stages(),
+                "top_hours": _top_hours_stages(),
+            }
+        },
+    ]
+
+    facets = (await _aggregate(("dashboard", days), pipeline, 1))[0]
+
+    return {
+        "period_days": days,
+        **_overview_from(facets["overview"]),
+        "hourly_trends": _trends_from(facets["hourly"]),
+        "daily_trends": _trends_from(facets["daily"]),
+        "cameras": facets["cameras"],
+        "top_hours": _top_hours_from(facets["top_hours"]),
+    }
+
+
+@router.get("/overview")
+async def get_analytics_overview(
+    days: int = Query(7, ge=1, le=90),
+    user: dict = Depends(get_current_user),
+):
+    """Get analytics dashboard overview: totals by event type."""
+    cutoff = datetime.now(UTC) - timedelta(days=days)
+
+    pipeline = [{"$match": {"timestamp": {"$gte": cutoff}}}, *_overview_stages()]
+
+    type_stats = await _aggregate(("overview", days), pipeline, 50)
+
+    return {"period_days": days, **_overview_from(type_stats)}
+
+
 @router.get("/trends")
 async def get_detection_trends(
     days: int = Query(7, ge=1, le=90),
@@ -50,39 +204,17 @@ async def get_detection_trends(
     user: dict = Depends(get_current_user),
 ):
     """Get hourly detection count trends grouped by event type."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = datetime.now(UTC) - timedelta(days=days)
 
     match_stage: dict = {"timestamp": {"$gte": cutoff}}
     if camera_id:
         match_stage["camera_id"] = camera_id
 
-    pipeline = [
-        {"$match": match_stage},
-        {
-            "$group": {
-                "_id": {
-                    "hour": {"$hour": "$timestamp"},
-                    "type": "$event_type",
-                },
-                "count": {"$sum": 1},
-            }
-        },
-        {"$sort": {"_id.hour": 1}},
-    ]
+    pipeline = [{"$match": match_stage}, *_hourly_stages()]
 
-    cursor = events_collection().aggregate(pipeline)
-    results = await cursor.to_list(length=500)
+    results = await _aggregate(("trends", days, camera_id), pipeline, 1)
 
-    # Reshape into hourly buckets
-    hourly: dict = {}
-    for r in results:
-        hour = r["_id"]["hour"]
-        event_type = r["_id"]["type"]
-        if hour not in hourly:
-            hourly[hour] = {}
-        hourly[hour][event_type] = r["count"]
-
-    return {"period_days": days, "hourly_trends": hourly}
+    return {"period_days": days, "hourly_trends": _trends_from(results)}
 
 
 @router.get("/daily")
@@ -92,42 +224,17 @@ async def get_daily_trends(
     user: dict = Depends(get_current_user),
 ):
     """Get daily event counts for the past N days, grouped by event type."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = datetime.now(UTC) - timedelta(days=days)
 
     match_stage: dict = {"timestamp": {"$gte": cutoff}}
     if camera_id:
         match_stage["camera_id"] = camera_id
 
-    pipeline = [
-        {"$match": match_stage},
-        {
-            "$group": {
-                "_id": {
-                    "year": {"$year": "$timestamp"},
-                    "month": {"$month": "$timestamp"},
-                    "day": {"$dayOfMonth": "$timestamp"},
-                    "type": "$event_type",
-                },
-                "count": {"$sum": 1},
-            }
-        },
-        {"$sort": {"_id.year": 1, "_id.month": 1, "_id.day": 1}},
-    ]
+    pipeline = [{"$match": match_stage}, *_daily_stages()]
 
-    cursor = events_collection().aggregate(pipeline)
-    results = await cursor.to_list(length=500)
-
-    # Reshape into daily map: "YYYY-MM-DD" -> {type: count}
-    daily: dict = {}
-    for r in results:
-        d = r["_id"]
-        date_str = f"{d['year']}-{d['month']:02d}-{d['day']:02d}"
-        event_type = d["type"]
-        if date_str not in daily:
-            daily[date_str] = {}
-        daily[date_str][event_type] = r["count"]
+    results = await _aggregate(("daily", days, camera_id), pipeline, 1)
 
-    return {"period_days": days, "daily_trends": daily}
+    return {"period_days": days, "daily_trends": _trends_from(results)}
 
 
 @router.get("/cameras")
@@ -136,32 +243,11 @@ async def get_per_camera_stats(
     user: dict = Depends(get_current_user),
 ):
     """Return per-camera event counts sorted descending."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = datetime.now(UTC) - timedelta(days=days)
 
-    pipeline = [
-        {"$match": {"timestamp": {"$gte": cutoff}}},
-        {
-            "$group": {
-                "_id": "$camera_id",
-                "count": {"$sum": 1},
-            }
-        },
-        {"$sort": {"count": -1}},
-        {"$limit": 20},
-    ]
+    pipeline = [{"$match": {"timestamp": {"$gte": cutoff}}}, *_camera_stages()]
 
-    cursor = events_collection().aggregate(pipeline)
-    results = await cursor.to_list(length=20)
-
-    # Enrich with camera names
-    enriched = []
-    for r in results:
-        cam = await cameras_collection().find_one({"_id": __import__("bson").ObjectId(r["_id"])}, {"name": 1})
-        enriched.append({
-            "camera_id": r["_id"],
-            "camera_name": cam["name"] if cam else r["_id"],
-            "event_count": r["count"],
-        })
+    enriched = await _aggregate(("cameras", days), pipeline, 20)
 
     return {"period_days": days, "cameras": enriched}
 
@@ -172,19 +258,10 @@ async def get_top_activity_hours(
     user: dict = Depends(get_current_user),
 ):
     """Return the top 5 busiest hours of the day."""
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    cutoff = datetime.now(UTC) - timedelta(days=days)
 
-    pipeline = [
-        {"$match": {"timestamp": {"$gte": cutoff}}},
-        {"$group": {"_id": {"$hour": "$timestamp"}, "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 5},
-    ]
+    pipeline = [{"$match": {"timestamp": {"$gte": cutoff}}}, *_top_hours_stages()]
 
-    cursor = events_collection().aggregate(pipeline)
-    results = await cursor.to_list(length=5)
+    results = await _aggregate(("top_hours", days), pipeline, 5)
 
-    return {
-        "period_days": days,
-        "top_hours": [{"hour": r["_id"], "count": r["count"]} for r in results],
-    }
+    return {"period_days": days, "top_hours": _top_hours_from(results)}
@@ -1,17 +1,21 @@
 """
 Authentication routes – Login, signup, user management.
 """
+import asyncio
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException, status, Depends
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, status, Depends, Response
+from pymongo.errors import DuplicateKeyError
 
 from app.database import users_collection
+from app.core.object_id import parse_object_id
 from app.core.security import (
     hash_password,
     verify_password,
+    password_needs_rehash,
     create_access_token,
     get_current_user,
     require_admin,
+    invalidate_user_cache,
 )
 from app.models.user import (
     UserCreate,
@@ -19,6 +23,7 @@ from app.models.user import (
     UserUpdate,
     UserResponse,
     TokenResponse,
+    USER_LIST_ADAPTER,
 )
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -41,12 +46,22 @@ def _user_doc_to_response(user: dict) -> UserResponse:
 async def login(credentials: UserLogin):
     """Authenticate user and return JWT token."""
     user = await users_collection().find_one({"username": credentials.username})
-    if not user or not verify_password(credentials.password, user["password_hash"]):
+    if not user or not await asyncio.to_thread(
+        verify_password, credentials.password, user["password_hash"]
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password",
         )
 
+    # Transparently upgrade legacy bcrypt hashes to Argon2id
+    if password_needs_rehash(user["password_hash"]):
+        new_hash = await asyncio.to_thread(hash_password, credentials.password)
+        await users_collection().update_one(
+            {"_id": user["_id"]},
+            {"$set": {"password_hash": new_hash}},
+        )
+
     token = create_access_token(data={"sub": user["username"]})
     return TokenResponse(
         access_token=token,
@@ -57,33 +72,34 @@ async def login(credentials: UserLogin):
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
     """Register a new user."""
-    # Check if username or email already exists
-    existing = await users_collection().find_one(
-        {"$or": [{"username": user_data.username}, {"email": user_data.email}]}
+    # Hash in a worker thread while the first-user check runs; first user is
+    # always admin, subsequent users default to viewer
+    password_hash, user_count = await asyncio.gather(
+        asyncio.to_thread(hash_password, user_data.password),
+        users_collection().estimated_document_count(),
     )
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Username or email already exists",
-        )
+    role = "admin" if user_count == 0 else "viewer"
 
     now = datetime.now(timezone.utc)
 
-    # First user is always admin, subsequent users default to viewer
-    user_count = await users_collection().count_documents({})
-    role = "admin" if user_count == 0 else "viewer"
-
     user_doc = {
         "username": user_data.username,
         "email": user_data.email,
-        "password_hash": hash_password(user_data.password),
+        "password_hash": password_hash,
         "role": role,
         "must_change_password": False,
         "created_at": now,
         "updated_at": now,
     }
 
-    result = await users_collection().insert_one(user_doc)
+    # Unique indexes on username/email reject duplicates atomically
+    try:
+        result = await users_collection().insert_one(user_doc)
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username or email already exists",
+        )
     user_doc["_id"] = result.inserted_id
 
     token = create_access_token(data={"sub": user_data.username})
@@ -102,9 +118,10 @@ async def get_current_user_profile(user: dict = Depends(get_current_user)):
 @router.get("/users", response_model=list[UserResponse])
 async def list_users(admin: dict = Depends(require_admin)):
     """List all users (admin only)."""
-    cursor = users_collection().find()
+    cursor = users_collection().find({}, {"password_hash": 0})
     users = await cursor.to_list(length=100)
-    return [_user_doc_to_response(u) for u in users]
+    content = USER_LIST_ADAPTER.dump_json([_user_doc_to_response(u) for u in users])
+    return Response(content=content, media_type="application/json")
 
 
 @router.put("/users/{user_id}", response_model=UserResponse)
@@ -114,11 +131,12 @@ async def update_user(
     admin: dict = Depends(require_admin),
 ):
     """Update a user (admin only)."""
+    oid = parse_object_id(user_id, "user")
     update_dict = {}
     if update.email is not None:
         update_dict["email"] = update.email
     if update.password is not None:
-        update_dict["password_hash"] = hash_password(update.password)
+        update_dict["password_hash"] = await asyncio.to_thread(hash_password, update.password)
     if update.role is not None:
         update_dict["role"] = update.role.value
 
@@ -127,21 +145,29 @@ async def update_user(
 
     update_dict["updated_at"] = datetime.now(timezone.utc)
 
-    result = await users_collection().find_one_and_update(
-        {"_id": ObjectId(user_id)},
-        {"$set": update_dict},
-        return_document=True,
-    )
+    try:
+        result = await users_collection().find_one_and_update(
+            {"_id": oid},
+            {"$set": update_dict},
+            return_document=True,
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Email already in use")
     if not result:
         raise HTTPException(status_code=404, detail="User not found")
 
+    invalidate_user_cache(result["username"])
     return _user_doc_to_response(result)
 
 
 @router.delete("/users/{user_id}")
 async def delete_user(user_id: str, admin: dict = Depends(require_admin)):
     """Delete a user (admin only)."""
-    result = await users_collection().delete_one({"_id": ObjectId(user_id)})
-    if result.deleted_count == 0:
+    oid = parse_object_id(user_id, "user")
+    result = await users_collection().find_one_and_delete(
+        {"_id": oid}, {"username": 1}
+    )
+    if not result:
         raise HTTPException(status_code=404, detail="User not found")
+    invalidate_user_cache(result["username"])
     return {"message": "User deleted successfully"}
@@ -1,16 +1,19 @@
 """
 Camera management routes – CRUD + live stream control.
 """
+import zlib
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, status, Depends, WebSocket, WebSocketDisconnect, Response
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, status, Depends, WebSocket, WebSocketDisconnect, Request, Response
+from pymongo.errors import DuplicateKeyError
 
 from app.database import cameras_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user, require_admin
 from app.core.websocket import ws_manager
-from app.models.camera import CameraCreate, CameraUpdate, CameraResponse
+from app.services.stream_manager import stream_manager
+from app.models.camera import CameraCreate, CameraUpdate, CameraResponse, CAMERA_LIST_ADAPTER
 from app.config import settings
 
 import logging
@@ -19,6 +22,14 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/cameras", tags=["Cameras"])
 
 
+# Fields read by _cam_doc_to_response — everything else stays on the server
+_CAMERA_PROJECTION = {
+    "name": 1, "rtsp_url": 1, "location": 1, "enabled": 1,
+    "detection_config": 1, "recording_config": 1, "resolution": 1,
+    "fps": 1, "status": 1, "created_at": 1, "updated_at": 1,
+}
+
+
 def _cam_doc_to_response(cam: dict) -> CameraResponse:
     """Convert MongoDB camera document to response model."""
     return CameraResponse(
@@ -42,15 +53,15 @@ def _cam_doc_to_response(cam: dict) -> CameraResponse:
 @router.get("", response_model=list[CameraResponse])
 async def list_cameras(user: dict = Depends(get_current_user)):
     """List all cameras."""
-    cursor = cameras_collection().find()
+    cursor = cameras_collection().find({}, _CAMERA_PROJECTION)
     cameras = await cursor.to_list(length=500)
-    return [_cam_doc_to_response(c) for c in cameras]
+    content = CAMERA_LIST_ADAPTER.dump_json([_cam_doc_to_response(c) for c in cameras])
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/streams/all-status")
 async def get_all_stream_statuses(user: dict = Depends(get_current_user)):
     """Get health status for all active streams."""
-    from app.services.stream_manager import stream_manager
     return stream_manager.get_all_statuses()
 
 
@@ -60,12 +71,6 @@ async def create_camera(
     admin: dict = Depends(require_admin),
 ):
     """Add a new camera and auto-start its stream (admin only)."""
-    from app.services.stream_manager import stream_manager
-
-    existing = await cameras_collection().find_one({"name": camera.name})
-    if existing:
-        raise HTTPException(status_code=409, detail="Camera name already exists")
-
     now = datetime.now(timezone.utc)
     cam_doc = {
         **camera.model_dump(),
@@ -74,7 +79,11 @@ async def create_camera(
         "updated_at": now,
     }
 
-    result = await cameras_collection().insert_one(cam_doc)
+    # The unique index on name rejects duplicates atomically
+    try:
+        result = await cameras_collection().insert_one(cam_doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Camera name already exists")
     cam_doc["_id"] = result.inserted_id
     cam_id = str(result.inserted_id)
 
@@ -92,7 +101,8 @@ async def create_camera(
 @router.get("/{camera_id}", response_model=CameraResponse)
 async def get_camera(camera_id: str, user: dict = Depends(get_current_user)):
     """Get camera details by ID."""
-    cam = await cameras_collection().find_one({"_id": ObjectId(camera_id)})
+    oid = parse_object_id(camera_id, "camera")
+    cam = await cameras_collection().find_one({"_id": oid}, _CAMERA_PROJECTION)
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
     return _cam_doc_to_response(cam)
@@ -105,36 +115,34 @@ async def update_camera(
     admin: dict = Depends(require_admin),
 ):
     """Update camera configuration (admin only). Restarts stream if RTSP URL changes."""
-    from app.services.stream_manager import stream_manager
-
-    update_dict = {
-        k: v for k, v in update.model_dump(exclude_unset=True).items() if v is not None
-    }
+    oid = parse_object_id(camera_id, "camera")
+    # Unset and null fields are both dropped inside pydantic-core's serializer
+    update_dict = update.model_dump(exclude_unset=True, exclude_none=True)
     if not update_dict:
         raise HTTPException(status_code=400, detail="No fields to update")
 
     update_dict["updated_at"] = datetime.now(timezone.utc)
 
-    result = await cameras_collection().find_one_and_update(
-        {"_id": ObjectId(camera_id)},
-        {"$set": update_dict},
-        return_document=True,
-    )
+    try:
+        result = await cameras_collection().find_one_and_update(
+            {"_id": oid},
+            {"$set": update_dict},
+            return_document=True,
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Camera name already exists")
     if not result:
         raise HTTPException(status_code=404, detail="Camera not found")
 
-    # If RTSP URL or FPS changed, restart the stream
-    if "rtsp_url" in update_dict or "fps" in update_dict:
-        fps = min(result.get("fps", 25), settings.STREAM_MAX_FPS)
+    # At most one stream operation per update: restarting a stream that the
+    # same request disables would just be torn down again
+    fps = min(result.get("fps", 25), settings.STREAM_MAX_FPS)
+    if update_dict.get("enabled") is False:
+        await stream_manager.stop_stream(camera_id)
+    elif "rtsp_url" in update_dict or "fps" in update_dict:
         await stream_manager.restart_stream(camera_id, result["rtsp_url"], fps)
-
-    # If toggled enabled/disabled
-    if "enabled" in update_dict:
-        if update_dict["enabled"]:
-            fps = min(result.get("fps", 25), settings.STREAM_MAX_FPS)
-            stream_manager.start_stream(camera_id, result["rtsp_url"], fps)
-        else:
-            await stream_manager.stop_stream(camera_id)
+    elif update_dict.get("enabled"):
+        stream_manager.start_stream(camera_id, result["rtsp_url"], fps)
 
     return _cam_doc_to_response(result)
 
@@ -142,11 +150,10 @@ async def update_camera(
 @router.delete("/{camera_id}")
 async def delete_camera(camera_id: str, admin: dict = Depends(require_admin)):
     """Remove a camera and stop its stream (admin only)."""
-    from app.services.stream_manager import stream_manager
-
+    oid = parse_object_id(camera_id, "camera")
     await stream_manager.stop_stream(camera_id)
 
-    result = await cameras_collection().delete_one({"_id": ObjectId(camera_id)})
+    result = await cameras_collection().delete_one({"_id": oid})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Camera not found")
     return {"message": "Camera deleted successfully"}
@@ -157,9 +164,8 @@ async def delete_camera(camera_id: str, admin: dict = Depends(require_admin)):
 @router.post("/{camera_id}/start")
 async def start_stream(camera_id: str, admin: dict = Depends(require_admin)):
     """Manually start a camera stream (admin only)."""
-    from app.services.stream_manager import stream_manager
-
-    cam = await cameras_collection().find_one({"_id": ObjectId(camera_id)})
+    oid = parse_object_id(camera_id, "camera")
+    cam = await cameras_collection().find_one({"_id": oid})
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
 
@@ -170,7 +176,7 @@ async def start_stream(camera_id: str, admin: dict = Depends(require_admin)):
     stream_manager.start_stream(camera_id, cam["rtsp_url"], fps)
 
     await cameras_collection().update_one(
-        {"_id": ObjectId(camera_id)}, {"$set": {"status": "connecting"}}
+        {"_id": oid}, {"$set": {"status": "connecting"}}
     )
     return {"message": "Stream started", "camera_id": camera_id}
 
@@ -178,26 +184,24 @@ async def start_stream(camera_id: str, admin: dict = Depends(require_admin)):
 @router.post("/{camera_id}/stop")
 async def stop_stream(camera_id: str, admin: dict = Depends(require_admin)):
     """Manually stop a camera stream (admin only)."""
-    from app.services.stream_manager import stream_manager
-
+    oid = parse_object_id(camera_id, "camera")
     if not stream_manager.is_streaming(camera_id):
         return {"message": "Stream not running", "camera_id": camera_id}
 
     await stream_manager.stop_stream(camera_id)
 
     await cameras_collection().update_one(
-        {"_id": ObjectId(camera_id)}, {"$set": {"status": "offline"}}
+        {"_id": oid}, {"$set": {"status": "offline"}}
     )
     return {"message": "Stream stopped", "camera_id": camera_id}
 
 
 @router.get("/{camera_id}/snapshot")
-async def get_snapshot(camera_id: str, user: dict = Depends(get_current_user)):
+async def get_snapshot(camera_id: str, request: Request, user: dict = Depends(get_current_user)):
     """Return the latest JPEG frame from a camera stream."""
-    from app.services.stream_manager import stream_manager
-
+    oid = parse_object_id(camera_id, "camera")
     # Verify camera exists
-    cam = await cameras_collection().find_one({"_id": ObjectId(camera_id)})
+    cam = await cameras_collection().find_one({"_id": oid}, {"_id": 1})
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
 
@@ -214,14 +218,18 @@ async def get_snapshot(camera_id: str, user: dict = Depends(get_current_user)):
     if jpeg is None:
         raise HTTPException(status_code=503, detail="No frame available – stream may be offline")
 
-    return Response(content=jpeg, media_type="image/jpeg")
+    # Pollers re-requesting an unchanged frame get a 304 instead of the JPEG
+    etag = f'"{zlib.crc32(jpeg):08x}"'
+    headers = {"Cache-Control": "no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=jpeg, media_type="image/jpeg", headers=headers)
 
 
 @router.get("/{camera_id}/stream-status")
 async def get_stream_status(camera_id: str, user: dict = Depends(get_current_user)):
     """Get the health/status of a camera stream."""
-    from app.services.stream_manager import stream_manager
-
     health = stream_manager.get_stream_status(camera_id)
     if health is None:
         return {
@@ -1,39 +1,52 @@
 """
 Event routes.
 """
+import asyncio
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException, Depends, Query
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 
-from app.database import events_collection, cameras_collection, faces_collection
+from app.database import events_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user
-from app.models.event import EventResponse, EventType
+from app.models.event import EventResponse, EventListResponse, EventType
 
 router = APIRouter(prefix="/api/events", tags=["Events"])
 
 
-async def _enrich_event(event: dict) -> EventResponse:
-    """Convert event document to response with camera/face names."""
-    camera_name = None
-    if event.get("camera_id"):
-        cam = await cameras_collection().find_one(
-            {"_id": ObjectId(event["camera_id"])}, {"name": 1}
-        )
-        if cam:
-            camera_name = cam["name"]
-
-    face_name = None
-    if event.get("face_id"):
-        face = await faces_collection().find_one(
-            {"_id": ObjectId(event["face_id"])}, {"name": 1}
-        )
-        if face:
-            face_name = face.get("name")
-
+def _to_object_id(field: str) -> dict:
+    """Aggregation expression: string id field -> ObjectId (null if malformed)."""
+    return {"$convert": {"input": field, "to": "objectId", "onError": None, "onNull": None}}
+
+
+# Joins camera and face names onto each event server-side, so a page of
+# events costs one round trip instead of two lookups per event.
+_ENRICH_STAGES = [
+    {"$addFields": {
+        "_cam_oid": _to_object_id("$camera_id"),
+        "_face_oid": _to_object_id("$face_id"),
+    }},
+    {"$lookup": {
+        "from": "cameras", "localField": "_cam_oid", "foreignField": "_id",
+        "pipeline": [{"$project": {"name": 1}}], "as": "_cam",
+    }},
+    {"$lookup": {
+        "from": "faces", "localField": "_face_oid", "foreignField": "_id",
+        "pipeline": [{"$project": {"name": 1}}], "as": "_face",
+    }},
+    {"$addFields": {
+        "camera_name": {"$first": "$_cam.name"},
+        "face_name": {"$first": "$_face.name"},
+    }},
+    {"$project": {"_cam_oid": 0, "_face_oid": 0, "_cam": 0, "_face": 0}},
+]
+
+
+def _event_to_response(event: dict) -> EventResponse:
+    """Convert an enriched event document (see _ENRICH_STAGES) to a response."""
     return EventResponse(
         id=str(event["_id"]),
         camera_id=str(event.get("camera_id", "")),
-        camera_name=camera_name,
+        camera_name=event.get("camera_name"),
         event_type=event["event_type"],
         confidence=event.get("confidence", 0),
         timestamp=event["timestamp"],
@@ -43,13 +56,13 @@ async def _enrich_event(event: dict) -> EventResponse:
         ai_summary=event.get("ai_summary", ""),
         detected_objects=event.get("detected_objects", []),
         face_id=str(event["face_id"]) if event.get("face_id") else None,
-        face_name=face_name,
+        face_name=event.get("face_name"),
         metadata=event.get("metadata", {}),
         created_at=event.get("created_at", event["timestamp"]),
     )
 
 
-@router.get("")
+@router.get("", response_model=EventListResponse)
 async def list_events(
     camera_id: str | None = Query(None),
     event_type: EventType | None = Query(None),
@@ -76,24 +89,27 @@ async def list_events(
     if min_confidence > 0:
         query["confidence"] = {"$gte": min_confidence}
 
-    total = await events_collection().count_documents(query)
     skip = (page - 1) * page_size
-    cursor = (
-        events_collection()
-        .find(query)
-        .sort("timestamp", -1)
-        .skip(skip)
-        .limit(page_size)
+    cursor = events_collection().aggregate([
+        {"$match": query},
+        {"$sort": {"timestamp": -1}},
+        {"$skip": skip},
+        {"$limit": page_size},
+        *_ENRICH_STAGES,
+    ])
+    total, events = await asyncio.gather(
+        events_collection().count_documents(query),
+        cursor.to_list(length=page_size),
+    )
+    body = EventListResponse(
+        events=[_event_to_response(e) for e in events],
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_pages=max(1, -(-total // page_size)),
     )
-    events = await cursor.to_list(length=page_size)
-    enriched = [await _enrich_event(e) for e in events]
-    return {
-        "events": [e.model_dump(by_alias=True) for e in enriched],
-        "total": total,
-        "page": page,
-        "page_size": page_size,
-        "total_pages": max(1, -(-total // page_size)),
-    }
+    # Serialize model -> JSON directly instead of model -> dict -> JSON
+    return Response(content=body.model_dump_json(), media_type="application/json")
 
 
 @router.get("/count")
@@ -122,16 +138,22 @@ async def count_events(
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(event_id: str, user: dict = Depends(get_current_user)):
     """Get event details by ID."""
-    event = await events_collection().find_one({"_id": ObjectId(event_id)})
-    if not event:
+    oid = parse_object_id(event_id, "event")
+    cursor = events_collection().aggregate([
+        {"$match": {"_id": oid}},
+        *_ENRICH_STAGES,
+    ])
+    events = await cursor.to_list(length=1)
+    if not events:
         raise HTTPException(status_code=404, detail="Event not found")
-    return await _enrich_event(event)
+    enriched = _event_to_response(events[0])
+    return Response(content=enriched.model_dump_json(), media_type="application/json")
 
 
 @router.delete("/{event_id}")
 async def delete_event(event_id: str, user: dict = Depends(get_current_user)):
     """Delete an event."""
-    result = await events_collection().delete_one({"_id": ObjectId(event_id)})
+    result = await events_collection().delete_one({"_id": parse_object_id(event_id, "event")})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Event not found")
     return {"message": "Event deleted successfully"}
@@ -2,25 +2,27 @@
 Face management routes.
 """
 from datetime import datetime, timezone
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Response
 import aiofiles
 import os
 
-import os
 import cv2
-import numpy as np
 import asyncio
 
 from app.database import faces_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user, require_admin
-from app.models.face import FaceCreate, FaceUpdate, FaceResponse
+from app.models.face import FaceCreate, FaceUpdate, FaceResponse, FACE_LIST_ADAPTER
 from app.config import settings
 from app.services.face_service import face_engine
 
 router = APIRouter(prefix="/api/faces", tags=["Faces"])
 
 FACES_UPLOAD_DIR = os.path.join(settings.MODELS_PATH, "face_references")
+os.makedirs(FACES_UPLOAD_DIR, exist_ok=True)
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_REFERENCE_IMAGE_BYTES = 20 * 1024 * 1024
 
 
 def _face_doc_to_response(face: dict) -> FaceResponse:
@@ -39,12 +41,18 @@ def _face_doc_to_response(face: dict) -> FaceResponse:
     )
 
 
+def _face_list_response(faces: list[dict]) -> Response:
+    """Serialize face documents to JSON in one pass via the cached adapter."""
+    content = FACE_LIST_ADAPTER.dump_json([_face_doc_to_response(f) for f in faces])
+    return Response(content=content, media_type="application/json")
+
+
 @router.get("", response_model=list[FaceResponse])
 async def list_faces(user: dict = Depends(get_current_user)):
     """List all known faces."""
     cursor = faces_collection().find({"is_known": True}).sort("name", 1)
     faces = await cursor.to_list(length=500)
-    return [_face_doc_to_response(f) for f in faces]
+    return _face_list_response(faces)
 
 
 @router.get("/unknown", response_model=list[FaceResponse])
@@ -52,7 +60,7 @@ async def list_unknown_faces(user: dict = Depends(get_current_user)):
     """List all unknown faces for labeling."""
     cursor = faces_collection().find({"is_known": False}).sort("last_seen", -1)
     faces = await cursor.to_list(length=500)
-    return [_face_doc_to_response(f) for f in faces]
+    return _face_list_response(faces)
 
 
 @router.post("", response_model=FaceResponse, status_code=201)
@@ -85,8 +93,9 @@ async def update_face(
     admin: dict = Depends(require_admin),
 ):
     """Update face profile (assign name to unknown face)."""
+    oid = parse_object_id(face_id, "face")
     result = await faces_collection().find_one_and_update(
-        {"_id": ObjectId(face_id)},
+        {"_id": oid},
         {
             "$set": {
                 "name": update.name,
@@ -108,21 +117,35 @@ async def upload_reference_image(
     admin: dict = Depends(require_admin),
 ):
     """Upload a reference image for a face profile."""
-    face = await faces_collection().find_one({"_id": ObjectId(face_id)})
+    oid = parse_object_id(face_id, "face")
+    face = await faces_collection().find_one({"_id": oid}, {"_id": 1})
     if not face:
         raise HTTPException(status_code=404, detail="Face not found")
 
-    os.makedirs(FACES_UPLOAD_DIR, exist_ok=True)
-    filename = f"{face_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{file.filename}"
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(status_code=400, detail="Reference must be an image")
+
+    # basename() keeps a crafted filename from escaping the upload directory
+    now = datetime.now(timezone.utc)
+    filename = f"{face_id}_{now.strftime('%Y%m%d%H%M%S')}_{os.path.basename(file.filename or 'image')}"
     filepath = os.path.join(FACES_UPLOAD_DIR, filename)
 
+    size = 0
     async with aiofiles.open(filepath, "wb") as f:
-        content = await file.read()
-        await f.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_REFERENCE_IMAGE_BYTES:
+                break
+            await f.write(chunk)
+    if size > MAX_REFERENCE_IMAGE_BYTES:
+        os.remove(filepath)
+        raise HTTPException(status_code=413, detail="Reference image is too large")
 
-    # Process face embedding
-    nparr = np.frombuffer(content, np.uint8)
-    img_cv = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    # Decode from disk in a worker thread rather than holding the upload in memory
+    img_cv = await asyncio.to_thread(cv2.imread, filepath, cv2.IMREAD_COLOR)
+    if img_cv is None:
+        os.remove(filepath)
+        raise HTTPException(status_code=400, detail="Could not decode the reference image")
 
     embedding = await asyncio.to_thread(face_engine.extract_embedding, img_cv)
     if embedding is None:
@@ -138,13 +161,13 @@ async def upload_reference_image(
     web_path = f"/face_references/{filename}"
 
     await faces_collection().update_one(
-        {"_id": ObjectId(face_id)},
+        {"_id": oid},
         {
             "$push": {
                 "reference_images": web_path,
                 "embedding_ids": point_id
             },
-            "$set": {"updated_at": datetime.now(timezone.utc)},
+            "$set": {"updated_at": now},
         },
     )
 
@@ -154,7 +177,8 @@ async def upload_reference_image(
 @router.delete("/{face_id}")
 async def delete_face(face_id: str, admin: dict = Depends(require_admin)):
     """Delete a face profile."""
-    result = await faces_collection().delete_one({"_id": ObjectId(face_id)})
+    oid = parse_object_id(face_id, "face")
+    result = await faces_collection().delete_one({"_id": oid})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Face not found")
     return {"message": "Face profile deleted"}
@@ -3,37 +3,68 @@ Heatmap routes – Activity heatmap data generated from detection bounding boxes
 """
 from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, Query
-from bson import ObjectId
+import numpy as np
 
 from app.database import events_collection, cameras_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user
+from app.core.ttl_cache import TTLCache
 
 router = APIRouter(prefix="/api/heatmaps", tags=["Heatmaps"])
 
+# Dashboards poll the same heatmaps repeatedly; responses are reused for a
+# short window.
+_heatmap_cache = TTLCache(ttl=30.0, maxsize=256)
 
-def _extract_event_bboxes(event: dict) -> list[dict]:
-    """Return all usable bounding boxes from an event.
+
+def _is_bbox(expr: str) -> dict:
+    """Aggregation test: ``expr`` is an object with numeric x, y, w and h."""
+    return {"$and": [
+        {"$eq": [{"$type": expr}, "object"]},
+        *({"$isNumber": f"{expr}.{k}"} for k in ("x", "y", "w", "h")),
+    ]}
+
+
+def _event_boxes() -> dict:
+    """Aggregation expression for all usable bounding boxes of an event.
 
     Prefer per-object boxes from detected_objects (merged-model friendly),
     and fall back to the legacy primary bounding_box.
     """
-    boxes: list[dict] = []
-
-    for obj in event.get("detected_objects", []) or []:
-        bbox = obj.get("bbox") if isinstance(obj, dict) else None
-        if not isinstance(bbox, dict):
-            continue
-        if all(k in bbox for k in ("x", "y", "w", "h")):
-            boxes.append(bbox)
-
-    if boxes:
-        return boxes
+    return {
+        "$let": {
+            "vars": {
+                "objs": {
+                    "$filter": {
+                        "input": {"$map": {
+                            "input": {"$ifNull": ["$detected_objects", []]},
+                            "as": "o",
+                            "in": "$$o.bbox",
+                        }},
+                        "as": "b",
+                        "cond": _is_bbox("$$b"),
+                    }
+                },
+            },
+            "in": {
+                "$cond": [
+                    {"$gt": [{"$size": "$$objs"}, 0]},
+                    "$$objs",
+                    {"$cond": [_is_bbox("$bounding_box"), ["$bounding_box"], []]},
+                ]
+            },
+        }
+    }
 
-    bbox = event.get("bounding_box")
-    if isinstance(bbox, dict) and all(k in bbox for k in ("x", "y", "w", "h")):
-        return [bbox]
 
-    return []
+def _grid_index(pos: str, size: str, frame: int, cells: int) -> dict:
+    """Grid cell (clamped to the grid) of a box centre along one axis."""
+    centre = {"$add": [
+        {"$trunc": f"$box.{pos}"},
+        {"$floor": {"$divide": [{"$trunc": f"$box.{size}"}, 2]}},
+    ]}
+    cell = {"$trunc": {"$multiply": [{"$divide": [centre, frame]}, cells]}}
+    return {"$min": [{"$max": [cell, 0]}, cells - 1]}
 
 
 @router.get("/{camera_id}")
@@ -48,28 +79,15 @@ async def get_heatmap(
     Generate a bounding-box based activity heatmap at grid_w x grid_h resolution.
     Returns a flat grid where each cell holds a detection count.
     """
+    cam_oid = parse_object_id(camera_id, "camera")
+    key = ("grid", camera_id, hours, grid_w, grid_h)
+    if (cached := _heatmap_cache.get(key)) is not None:
+        return cached
+
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
 
     # Lookup camera for resolution info (allows % normalisation)
-    cam = await cameras_collection().find_one({"_id": ObjectId(camera_id)}, {"resolution": 1})
-
-    # Pull events that have at least one usable detection box
-    cursor = events_collection().find(
-        {
-            "camera_id": camera_id,
-            "timestamp": {"$gte": cutoff},
-            "$or": [
-                {"detected_objects": {"$exists": True, "$ne": []}},
-                {"bounding_box": {"$exists": True, "$ne": None}},
-            ],
-        },
-        {"bounding_box": 1, "detected_objects": 1},
-    )
-
-    events = await cursor.to_list(length=5000)
-
-    # Initialise empty grid
-    grid = [[0] * grid_w for _ in range(grid_h)]
+    cam = await cameras_collection().find_one({"_id": cam_oid}, {"resolution": 1})
 
     # Use camera resolution if available for proper normalisation
     frame_w, frame_h = 1920, 1080
@@ -80,36 +98,49 @@ async def get_heatmap(
     frame_w = max(frame_w, 1)
     frame_h = max(frame_h, 1)
 
-    total_heat = 0
-    for event in events:
-        for bbox in _extract_event_bboxes(event):
-            bx = int(bbox.get("x", 0))
-            by = int(bbox.get("y", 0))
-            bw = int(bbox.get("w", 0))
-            bh = int(bbox.get("h", 0))
-
-            # Centre of the bounding box
-            cx = bx + bw // 2
-            cy = by + bh // 2
-
-            # Normalize to grid coordinates
-            gx = min(int(cx / frame_w * grid_w), grid_w - 1)
-            gy = min(int(cy / frame_h * grid_h), grid_h - 1)
+    # Bin box centres server-side; only one small doc per non-empty cell
+    # comes back instead of every matching event
+    pipeline = [
+        {
+            "$match": {
+                "camera_id": camera_id,
+                "timestamp": {"$gte": cutoff},
+                "$or": [
+                    {"detected_objects": {"$exists": True, "$ne": []}},
+                    {"bounding_box": {"$exists": True, "$ne": None}},
+                ],
+            }
+        },
+        {"$project": {"_id": 0, "box": _event_boxes()}},
+        {"$unwind": "$box"},
+        {
+            "$group": {
+                "_id": {"$add": [
+                    {"$multiply": [_grid_index("y", "h", frame_h, grid_h), grid_w]},
+                    _grid_index("x", "w", frame_w, grid_w),
+                ]},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
 
-            grid[gy][gx] += 1
-            total_heat += 1
+    cursor = events_collection().aggregate(pipeline)
+    cells = await cursor.to_list(length=grid_w * grid_h)
 
-    # Flatten to a 1D list for JSON serialization
-    flat = [val for row in grid for val in row]
+    grid = np.zeros(grid_w * grid_h, dtype=np.int64)
+    if cells:
+        grid[np.array([c["_id"] for c in cells], dtype=np.int64)] = [c["count"] for c in cells]
+    total_heat = int(grid.sum())
+    flat = grid.tolist()
 
-    return {
+    return _heatmap_cache.put(key, {
         "camera_id": camera_id,
         "period_hours": hours,
         "grid_width": grid_w,
         "grid_height": grid_h,
         "total_detections": total_heat,
         "heatmap_data": flat,
-    }
+    })
 
 
 @router.get("/")
@@ -118,6 +149,10 @@ async def list_camera_heatmap_summary(
     user: dict = Depends(get_current_user),
 ):
     """Return high-level heatmap activity summary for all cameras."""
+    key = ("summary", hours)
+    if (cached := _heatmap_cache.get(key)) is not None:
+        return cached
+
     cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
 
     pipeline = [
@@ -145,18 +180,32 @@ async def list_camera_heatmap_summary(
         },
         {"$group": {"_id": "$camera_id", "count": {"$sum": "$det_count"}}},
         {"$sort": {"count": -1}},
+        {"$limit": 50},
+        # Join camera names server-side — one round trip instead of one per camera
+        {
+            "$lookup": {
+                "from": cameras_collection().name,
+                "let": {
+                    "cid": {"$convert": {"input": "$_id", "to": "objectId", "onError": None, "onNull": None}},
+                },
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$cid"]}}},
+                    {"$project": {"name": 1}},
+                ],
+                "as": "cam",
+            }
+        },
+        {
+            "$project": {
+                "_id": 0,
+                "camera_id": "$_id",
+                "camera_name": {"$ifNull": [{"$first": "$cam.name"}, "$_id"]},
+                "detection_count": "$count",
+            }
+        },
     ]
 
     cursor = events_collection().aggregate(pipeline)
-    results = await cursor.to_list(length=50)
-
-    enriched = []
-    for r in results:
-        cam = await cameras_collection().find_one({"_id": ObjectId(r["_id"])}, {"name": 1})
-        enriched.append({
-            "camera_id": r["_id"],
-            "camera_name": cam["name"] if cam else r["_id"],
-            "detection_count": r["count"],
-        })
-
-    return {"period_hours": hours, "cameras": enriched}
+    enriched = await cursor.to_list(length=50)
+
+    return _heatmap_cache.put(key, {"period_hours": hours, "cameras": enriched})
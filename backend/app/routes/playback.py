@@ -3,16 +3,68 @@ Playback / Recording routes.
 """
 from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends, Query, Request
-from fastapi.responses import FileResponse
-from bson import ObjectId
+from fastapi.responses import StreamingResponse
+import aiofiles
 import os
 
 from app.database import recordings_collection, cameras_collection
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user
 from app.models.recording import RecordingResponse, RecordingExportRequest, CalendarDay
 
 router = APIRouter(prefix="/api/recordings", tags=["Playback"])
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+_MEDIA_TYPES = {'.webm': 'video/webm', '.mp4': 'video/mp4', '.avi': 'video/x-msvideo'}
+
+
+def _parse_range(range_header: str, file_size: int) -> tuple[int, int] | None:
+    """Parse a single ``bytes=`` range into inclusive (start, end) offsets.
+
+    Handles open-ended (``START-``) and suffix (``-N``) forms. A header that
+    cannot be parsed (another unit, garbage, several ranges) returns None so
+    the caller serves the whole file, as RFC 9110 asks; a well-formed range
+    that cannot be satisfied gets 416 with the file size.
+    """
+    unit, _, spec = range_header.partition("=")
+    first, dash, last = spec.strip().partition("-")
+    if (
+        unit.strip().lower() != "bytes"
+        or not dash
+        or not (first.isdigit() or first == "")
+        or not (last.isdigit() or last == "")
+        or not (first or last)
+        or (first and last and int(last) < int(first))
+    ):
+        return None
+
+    if first:
+        start = int(first)
+        end = min(int(last), file_size - 1) if last else file_size - 1
+    else:
+        start = max(file_size - int(last), 0)
+        end = file_size - 1 if int(last) > 0 else -1
+    if start > end or start >= file_size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"},
+        )
+    return start, end
+
+
+async def _iter_file(filepath: str, start: int, length: int):
+    """Yield ``length`` bytes of ``filepath`` from ``start`` without blocking the loop."""
+    async with aiofiles.open(filepath, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
 
 def _rec_doc_to_response(rec: dict, camera_name: str = None) -> RecordingResponse:
     return RecordingResponse(
@@ -113,10 +165,7 @@ async def stream_recording(
     request: Request,
 ):
     """Stream a recording file with HTTP Range support for <video> element."""
-    from fastapi.responses import StreamingResponse
-    import stat
-
-    rec = await recordings_collection().find_one({"_id": ObjectId(recording_id)})
+    rec = await recordings_collection().find_one({"_id": parse_object_id(recording_id, "recording")}, {"file_path": 1})
     if not rec:
         raise HTTPException(status_code=404, detail="Recording not found")
 
@@ -126,64 +175,37 @@ async def stream_recording(
 
     # Auto-detect media type from extension
     ext = os.path.splitext(filepath)[1].lower()
-    media_types = {'.webm': 'video/webm', '.mp4': 'video/mp4', '.avi': 'video/x-msvideo'}
-    media_type = media_types.get(ext, 'video/mp4')
+    media_type = _MEDIA_TYPES.get(ext, 'video/mp4')
 
     file_size = os.path.getsize(filepath)
     range_header = request.headers.get("range")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'inline; filename="{os.path.basename(filepath)}"',
+    }
 
-    if range_header:
-        # Parse Range: bytes=START-END
-        range_spec = range_header.replace("bytes=", "").strip()
-        parts = range_spec.split("-")
-        start = int(parts[0]) if parts[0] else 0
-        end = int(parts[1]) if parts[1] else file_size - 1
-        end = min(end, file_size - 1)
+    byte_range = _parse_range(range_header, file_size) if range_header else None
+    if byte_range:
+        start, end = byte_range
         content_length = end - start + 1
-
-        def iter_range():
-            with open(filepath, "rb") as f:
-                f.seek(start)
-                remaining = content_length
-                chunk_size = 64 * 1024  # 64 KB chunks
-                while remaining > 0:
-                    read_size = min(chunk_size, remaining)
-                    data = f.read(read_size)
-                    if not data:
-                        break
-                    remaining -= len(data)
-                    yield data
-
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        headers["Content-Length"] = str(content_length)
         return StreamingResponse(
-            iter_range(),
+            _iter_file(filepath, start, content_length),
             status_code=206,
             media_type=media_type,
-            headers={
-                "Content-Range": f"bytes {start}-{end}/{file_size}",
-                "Accept-Ranges": "bytes",
-                "Content-Length": str(content_length),
-                "Content-Disposition": f'inline; filename="{os.path.basename(filepath)}"',
-            },
+            headers=headers,
         )
 
-    # No Range header — serve the whole file
-    def iter_file():
-        with open(filepath, "rb") as f:
-            while chunk := f.read(64 * 1024):
-                yield chunk
-
+    # No usable Range header — serve the whole file
+    headers["Content-Length"] = str(file_size)
     return StreamingResponse(
-        iter_file(),
+        _iter_file(filepath, 0, file_size),
         media_type=media_type,
-        headers={
-            "Accept-Ranges": "bytes",
-            "Content-Length": str(file_size),
-            "Content-Disposition": f'inline; filename="{os.path.basename(filepath)}"',
-        },
+        headers=headers,
     )
 
 
-
 @router.post("/export")
 async def export_recording(
     request: RecordingExportRequest,
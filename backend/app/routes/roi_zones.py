@@ -5,8 +5,8 @@ from datetime import datetime, timezone
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
-from bson import ObjectId
 
+from app.core.object_id import parse_object_id
 from app.core.security import get_current_user
 from app.database import roi_zones_collection, cameras_collection
 
@@ -153,7 +153,7 @@ async def create_zone(
 ):
     """Create a new ROI zone."""
     # Validate camera exists
-    cam = await cameras_collection().find_one({"_id": ObjectId(zone.camera_id)})
+    cam = await cameras_collection().find_one({"_id": parse_object_id(zone.camera_id, "camera")})
     if not cam:
         raise HTTPException(status_code=404, detail="Camera not found")
 
@@ -178,7 +178,8 @@ async def update_zone(
     user: dict = Depends(get_current_user),
 ):
     """Update an existing ROI zone."""
-    existing = await roi_zones_collection().find_one({"_id": ObjectId(zone_id)})
+    oid = parse_object_id(zone_id, "zone")
+    existing = await roi_zones_collection().find_one({"_id": oid})
     if not existing:
         raise HTTPException(status_code=404, detail="Zone not found")
 
@@ -188,10 +189,10 @@ async def update_zone(
 
     updates["updated_at"] = datetime.now(timezone.utc)
     await roi_zones_collection().update_one(
-        {"_id": ObjectId(zone_id)}, {"$set": updates}
+        {"_id": oid}, {"$set": updates}
     )
 
-    updated = await roi_zones_collection().find_one({"_id": ObjectId(zone_id)})
+    updated = await roi_zones_collection().find_one({"_id": oid})
     return {"zone": _doc_to_resp(updated)}
 
 
@@ -201,7 +202,7 @@ async def delete_zone(
     user: dict = Depends(get_current_user),
 ):
     """Delete an ROI zone."""
-    result = await roi_zones_collection().delete_one({"_id": ObjectId(zone_id)})
+    result = await roi_zones_collection().delete_one({"_id": parse_object_id(zone_id, "zone")})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Zone not found")
     return {"message": "Zone deleted", "id": zone_id}
@@ -3,9 +3,19 @@ Settings routes – Storage, Notifications, LLM configuration.
 """
 from datetime import datetime, timezone
 from fastapi import APIRouter, HTTPException, Depends
+from pymongo import UpdateOne
 
 from app.database import settings_collection
-from app.core.security import get_current_user, require_admin, encrypt_credential, decrypt_credential
+from app.core.security import (
+    get_current_user,
+    require_admin,
+    encrypt_credential,
+    decrypt_credential,
+    is_encrypted_credential,
+    credential_to_text,
+    credential_from_text,
+)
+from app.services.llm_service import llm_service
 from app.models.settings import (
     SettingsCategory,
     StorageSettings,
@@ -16,12 +26,16 @@ from app.models.settings import (
 
 router = APIRouter(prefix="/api/settings", tags=["Settings"])
 
+# Defaults returned before anything is saved — dumped once, not per request
+_DEFAULT_NOTIFICATION_SETTINGS = NotificationSettings().model_dump()
+_DEFAULT_LLM_SETTINGS = LLMSettings().model_dump()
+
 
 async def _get_settings_dict(category: str) -> dict:
     """Get all settings for a category as a dict."""
     cursor = settings_collection().find({"category": category})
     docs = await cursor.to_list(length=100)
-    return {doc["key"]: doc["value"] for doc in docs}
+    return {doc["key"]: credential_to_text(doc["value"]) for doc in docs}
 
 
 async def _save_settings_dict(category: str, data: dict) -> None:
@@ -31,17 +45,28 @@ async def _save_settings_dict(category: str, data: dict) -> None:
     }
     now = datetime.now(timezone.utc)
 
+    ops = []
     for key, value in data.items():
         # Encrypt sensitive credential values before storing
         store_value = value
-        if isinstance(value, str) and any(sk in key for sk in sensitive_keys) and value:
+        if is_encrypted_credential(value):
+            # Unchanged ciphertext echoed back by the client — don't re-encrypt it
+            store_value = credential_from_text(value)
+        elif isinstance(value, str) and any(sk in key for sk in sensitive_keys) and value:
             store_value = encrypt_credential(value)
 
-        await settings_collection().update_one(
+        ops.append(UpdateOne(
             {"category": category, "key": key},
             {"$set": {"value": store_value, "updated_at": now}},
             upsert=True,
-        )
+        ))
+
+    # One round trip for the whole form; keys are independent, so unordered
+    if ops:
+        await settings_collection().bulk_write(ops, ordered=False)
+
+    # Drop plaintexts of credentials that may just have been replaced
+    decrypt_credential.cache_clear()
 
 
 @router.get("/storage", response_model=StorageSettings)
@@ -65,7 +90,7 @@ async def update_storage_settings(
 async def get_notification_settings(user: dict = Depends(get_current_user)):
     """Get notification configuration."""
     data = await _get_settings_dict("notifications")
-    return data if data else NotificationSettings().model_dump()
+    return data if data else _DEFAULT_NOTIFICATION_SETTINGS
 
 
 @router.put("/notifications")
@@ -135,7 +160,7 @@ async def test_notification(
 async def get_llm_settings(user: dict = Depends(get_current_user)):
     """Get LLM/VLM provider configuration."""
     data = await _get_settings_dict("llm")
-    return data if data else LLMSettings().model_dump()
+    return data if data else _DEFAULT_LLM_SETTINGS
 
 
 @router.put("/llm")
@@ -151,6 +176,7 @@ async def update_llm_settings(
             flat[f"{provider_name}_{field_name}"] = field_value
 
     await _save_settings_dict("llm", flat)
+    llm_service.invalidate_settings()
     return {"message": "LLM settings updated"}
 
 
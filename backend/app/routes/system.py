@@ -1,6 +1,7 @@
 """
 System monitoring routes – GPU, CPU, RAM, storage stats.
 """
+import orjson
 import psutil
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
 import asyncio
@@ -19,7 +20,8 @@ router = APIRouter(prefix="/api/system", tags=["System Monitor"])
 async def get_system_stats(user: dict = Depends(get_current_user)):
     """Get current system resource statistics."""
     # CPU
-    cpu_percent = psutil.cpu_percent(interval=0.5)
+    # Sampling sleeps for the whole interval — do it off the event loop
+    cpu_percent = await asyncio.to_thread(psutil.cpu_percent, 0.5)
     cpu_count = psutil.cpu_count()
     cpu_freq = psutil.cpu_freq()
 
@@ -119,7 +121,7 @@ async def system_monitor_websocket(websocket: WebSocket):
                 ],
             }
 
-            await websocket.send_json(data)
+            await websocket.send_text(orjson.dumps(data).decode())
             await asyncio.sleep(2)  # Update every 2 seconds
     except WebSocketDisconnect:
         await ws_manager.disconnect(websocket, channel)
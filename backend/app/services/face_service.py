@@ -61,8 +61,8 @@ class FaceEngine:
             
         # If multiple faces, pick the largest one by bounding box area
         if len(faces) > 1:
-            faces = sorted(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1]), reverse=True)
-            
+            return max(faces, key=lambda f: (f.bbox[2] - f.bbox[0]) * (f.bbox[3] - f.bbox[1])).embedding
+
         return faces[0].embedding
 
     def enroll_face(self, face_id: str, embedding: np.ndarray) -> str:
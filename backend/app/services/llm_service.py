@@ -4,11 +4,12 @@ Supports multiple providers: Ollama, OpenAI, Gemini, OpenRouter.
 """
 import asyncio
 import logging
+import time
 import base64
 import httpx
 from typing import Dict, Any, List, Optional
 from app.database import settings_collection
-from app.core.security import decrypt_credential
+from app.core.security import decrypt_credential, is_encrypted_credential
 from app.models.event import EventType, DetectedObject
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,10 @@ logger = logging.getLogger(__name__)
 # Max pending summaries in queue — oldest are dropped when full
 _QUEUE_MAX = 20
 
+# Decrypted provider settings are reused for this long; PUT /settings/llm
+# invalidates them immediately
+_SETTINGS_TTL = 60.0
+
 # System prompt for event summaries
 _SUMMARY_SYSTEM = (
     "You are an expert security surveillance AI analyst for a video management system. "
@@ -38,6 +43,9 @@ class LLMService:
         self.timeout = httpx.Timeout(60.0, connect=10.0)
         self._queue: asyncio.Queue | None = None
         self._worker_task: asyncio.Task | None = None
+        self._settings_cache: Dict[str, Any] | None = None
+        self._http: httpx.AsyncClient | None = None
+        self._settings_at = 0.0
 
     def _ensure_queue(self):
         """Lazily create queue + worker on the running event loop."""
@@ -157,20 +165,46 @@ class LLMService:
         except asyncio.QueueFull:
             logger.warning("📝 Summary queue full — dropping oldest request")
 
+    def _client(self) -> httpx.AsyncClient:
+        """Shared HTTP client, created on first use so connections are pooled."""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            )
+        return self._http
+
+    async def close(self) -> None:
+        """Close the shared HTTP client (app shutdown)."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def invalidate_settings(self) -> None:
+        """Drop cached settings so the next call re-reads them."""
+        self._settings_cache = None
+
     async def _get_llm_settings(self) -> Dict[str, Any]:
         """Fetch all LLM settings from the database and decrypt keys."""
-        cursor = settings_collection().find({"key": {"$regex": "^(active_provider|ollama_|openai_|gemini_|openrouter_)"}})
+        if self._settings_cache is not None and time.monotonic() - self._settings_at < _SETTINGS_TTL:
+            return self._settings_cache
+
+        # Every LLM key is saved under category "llm" (routes/settings.py)
+        cursor = settings_collection().find({"category": "llm"}, {"_id": 0, "key": 1, "value": 1})
         docs = await cursor.to_list(length=100)
         settings = {}
         for doc in docs:
             key = doc["key"]
             value = doc["value"]
-            if isinstance(value, str) and value.startswith("gAAAAA") and "key" in key:
+            if is_encrypted_credential(value) and "key" in key:
                 try:
                     value = decrypt_credential(value)
                 except Exception:
                     pass
             settings[key] = value
+
+        self._settings_cache = settings
+        self._settings_at = time.monotonic()
         return settings
 
     async def generate_event_summary(self, event_type: EventType, confidence: float, objects: List[Dict], face_name: Optional[str] = None, snapshot_path: Optional[str] = None, camera_name: Optional[str] = None, camera_location: Optional[str] = None, timestamp=None) -> str:
@@ -418,24 +452,25 @@ class LLMService:
         model = settings.get("ollama_default_model", "llama3")
         ollama_timeout = httpx.Timeout(120.0, connect=10.0)
 
-        async with httpx.AsyncClient(timeout=ollama_timeout) as client:
-            resp = await client.post(
-                f"{base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "stream": False,
-                    "think": False,
-                    "keep_alive": -1,
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            msg = data.get("message", {})
-            content = msg.get("content", "")
-            if not content:
-                content = msg.get("thinking", "")
-            return content
+        client = self._client()
+        resp = await client.post(
+            f"{base_url}/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "stream": False,
+                "think": False,
+                "keep_alive": -1,
+            },
+            timeout=ollama_timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        msg = data.get("message", {})
+        content = msg.get("content", "")
+        if not content:
+            content = msg.get("thinking", "")
+        return content
 
     async def _stream_ollama(self, settings: Dict[str, Any], messages: list):
         """Stream Ollama chat response, yielding thinking and content chunks."""
@@ -444,54 +479,56 @@ class LLMService:
         model = settings.get("ollama_default_model", "llama3")
         ollama_timeout = httpx.Timeout(120.0, connect=10.0)
 
-        async with httpx.AsyncClient(timeout=ollama_timeout) as client:
-            async with client.stream(
-                "POST",
-                f"{base_url}/api/chat",
-                json={
-                    "model": model,
-                    "messages": messages,
-                    "stream": True,
-                    "keep_alive": -1,
-                },
-            ) as resp:
-                resp.raise_for_status()
-                async for line in resp.aiter_lines():
-                    if not line.strip():
-                        continue
-                    try:
-                        chunk = _json.loads(line)
-                    except _json.JSONDecodeError:
-                        continue
-                    msg = chunk.get("message", {})
-                    thinking = msg.get("thinking", "")
-                    content = msg.get("content", "")
-                    if thinking:
-                        yield {"type": "thinking", "text": thinking}
-                    if content:
-                        yield {"type": "content", "text": content}
-                    if chunk.get("done", False):
-                        yield {"type": "done", "text": ""}
-                        return
+        client = self._client()
+        async with client.stream(
+            "POST",
+            f"{base_url}/api/chat",
+            json={
+                "model": model,
+                "messages": messages,
+                "stream": True,
+                "keep_alive": -1,
+            },
+            timeout=ollama_timeout,
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    chunk = _json.loads(line)
+                except _json.JSONDecodeError:
+                    continue
+                msg = chunk.get("message", {})
+                thinking = msg.get("thinking", "")
+                content = msg.get("content", "")
+                if thinking:
+                    yield {"type": "thinking", "text": thinking}
+                if content:
+                    yield {"type": "content", "text": content}
+                if chunk.get("done", False):
+                    yield {"type": "done", "text": ""}
+                    return
 
     async def _call_ollama_vision(self, settings: Dict[str, Any], messages: list, vision_model: str) -> str:
         """Call Ollama with a dedicated vision model for image analysis."""
         base_url = settings.get("ollama_base_url", "http://localhost:11434").rstrip("/")
         vision_timeout = httpx.Timeout(120.0, connect=10.0)
 
-        async with httpx.AsyncClient(timeout=vision_timeout) as client:
-            resp = await client.post(
-                f"{base_url}/api/chat",
-                json={
-                    "model": vision_model,
-                    "messages": messages,
-                    "stream": False,
-                    "keep_alive": -1,
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("message", {}).get("content", "")
+        client = self._client()
+        resp = await client.post(
+            f"{base_url}/api/chat",
+            json={
+                "model": vision_model,
+                "messages": messages,
+                "stream": False,
+                "keep_alive": -1,
+            },
+            timeout=vision_timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("message", {}).get("content", "")
 
     async def _call_openai(self, settings: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
         base_url = settings.get("openai_base_url", "https://api.openai.com/v1").rstrip("/")
@@ -503,18 +540,18 @@ class LLMService:
             "Content-Type": "application/json"
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                f"{base_url}/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": messages,
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+        client = self._client()
+        resp = await client.post(
+            f"{base_url}/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": messages,
+            }
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"]
 
     async def _call_gemini(self, settings: Dict[str, Any], messages: list) -> str:
         api_key = settings.get("gemini_api_key", "")
@@ -550,18 +587,18 @@ class LLMService:
 
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                url,
-                json={"contents": contents}
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            try:
-                return data["candidates"][0]["content"]["parts"][0]["text"]
-            except (KeyError, IndexError):
-                logger.warning(f"Gemini returned unexpected response: {str(data)[:200]}")
-                return ""
+        client = self._client()
+        resp = await client.post(
+            url,
+            json={"contents": contents}
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        try:
+            return data["candidates"][0]["content"]["parts"][0]["text"]
+        except (KeyError, IndexError):
+            logger.warning(f"Gemini returned unexpected response: {str(data)[:200]}")
+            return ""
 
     async def _call_openrouter(self, settings: Dict[str, Any], messages: List[Dict[str, str]]) -> str:
         api_key = settings.get("openrouter_api_key", "")
@@ -574,18 +611,18 @@ class LLMService:
             "Content-Type": "application/json"
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            resp = await client.post(
-                "https://openrouter.ai/api/v1/chat/completions",
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": messages,
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data["choices"][0]["message"]["content"]
+        client = self._client()
+        resp = await client.post(
+            "https://openrouter.ai/api/v1/chat/completions",
+            headers=headers,
+            json={
+                "model": model,
+                "messages": messages,
+            }
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["choices"][0]["message"]["content"]
 
 
 llm_service = LLMService()
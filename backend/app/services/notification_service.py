@@ -10,7 +10,7 @@ from email.utils import make_msgid
 import aiosmtplib
 
 from app.database import settings_collection
-from app.core.security import decrypt_credential
+from app.core.security import decrypt_credential, is_encrypted_credential
 from app.services.email_templates import render_event_email
 
 logger = logging.getLogger(__name__)
@@ -27,13 +27,14 @@ class NotificationService:
 
     async def _get_notification_settings(self) -> Dict[str, Any]:
         """Fetch all notification settings from the database and decrypt keys."""
-        cursor = settings_collection().find({"key": {"$regex": "^(telegram_|whatsapp_|email_)"}})
+        # Every notification key is saved under category "notifications" (routes/settings.py)
+        cursor = settings_collection().find({"category": "notifications"}, {"_id": 0, "key": 1, "value": 1})
         docs = await cursor.to_list(length=100)
         settings = {}
         for doc in docs:
             key = doc["key"]
             value = doc["value"]
-            if isinstance(value, str) and value.startswith("gAAAAA") and any(sk in key for sk in ("bot_token", "api_key", "smtp_password", "api_url")):
+            if is_encrypted_credential(value) and any(sk in key for sk in ("bot_token", "api_key", "smtp_password", "api_url")):
                 try:
                     value = decrypt_credential(value)
                 except Exception:
@@ -135,7 +135,8 @@ class CameraStream:
         """Stop the reader thread and release capture."""
         self._running = False
         if self._thread and self._thread.is_alive():
-            self._thread.join(timeout=3.0)
+            # The reader may sit in a blocking read for seconds; wait off-loop
+            await asyncio.to_thread(self._thread.join, 3.0)
         self._release_capture()
         self.health.connected = False
         logger.info(f"⏹  Stream stopped: {self.camera_id}")
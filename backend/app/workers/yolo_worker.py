@@ -464,47 +464,49 @@ class DetectionWorker:
                     if matched_id:
                         face_id = matched_id
                         highest_conf_class = EventType.FACE_KNOWN
-                        update_fields: dict = {"last_seen": datetime.now(timezone.utc)}
+                        face_oid = ObjectId(face_id)
+                        # Count the appearance and read the thumbnail in one round trip
+                        face_doc = await faces_collection().find_one_and_update(
+                            {"_id": face_oid},
+                            {
+                                "$set": {"last_seen": datetime.now(timezone.utc)},
+                                "$inc": {"total_appearances": 1},
+                            },
+                            projection={"thumbnail": 1},
+                        )
                         # Save face crop thumbnail if face doesn't have one yet
-                        face_doc = await faces_collection().find_one({"_id": ObjectId(face_id)})
                         if face_doc and not face_doc.get("thumbnail"):
                             crop_path = self._save_face_crop(crop, face_id)
                             if crop_path:
-                                update_fields["thumbnail"] = crop_path
-                        await faces_collection().update_one(
-                            {"_id": ObjectId(face_id)},
-                            {"$set": update_fields, "$inc": {"total_appearances": 1}}
-                        )
+                                await faces_collection().update_one(
+                                    {"_id": face_oid},
+                                    {"$set": {"thumbnail": crop_path}}
+                                )
                     else:
                         highest_conf_class = EventType.FACE_UNKNOWN
                         now_utc = datetime.now(timezone.utc)
+                        # Id is minted up front so the thumbnail goes in with the insert
+                        face_oid = ObjectId()
+                        face_id = str(face_oid)
                         doc = {
+                            "_id": face_oid,
                             "name": None,
                             "is_known": False,
                             "reference_images": [],
                             "embedding_ids": [],
-                            "thumbnail": None,
+                            "thumbnail": self._save_face_crop(crop, face_id),
                             "first_seen": now_utc,
                             "last_seen": now_utc,
                             "total_appearances": 1,
                             "created_at": now_utc,
                             "updated_at": now_utc,
                         }
-                        insert_res = await faces_collection().insert_one(doc)
-                        face_id = str(insert_res.inserted_id)
-
-                        # Save face crop thumbnail
-                        crop_path = self._save_face_crop(crop, face_id)
-                        if crop_path:
-                            await faces_collection().update_one(
-                                {"_id": insert_res.inserted_id},
-                                {"$set": {"thumbnail": crop_path}}
-                            )
+                        await faces_collection().insert_one(doc)
 
                         point_id = await asyncio.to_thread(face_engine.enroll_face, face_id, embedding)
                         if point_id:
                             await faces_collection().update_one(
-                                {"_id": insert_res.inserted_id},
+                                {"_id": face_oid},
                                 {"$push": {"embedding_ids": point_id}}
                             )
 
@@ -6,9 +6,14 @@ import os
 os.environ["NO_ALBUMENTATIONS_UPDATE"] = "1"  # Suppress albumentations version-check nag
 
 import argparse
+import importlib.util
 import uvicorn
 from app.config import settings
 
+# uvloop speeds up the asyncio hot paths (ZMQ receiver, WebSocket fan-out);
+# it is not available on Windows, where uvicorn's default loop is used.
+LOOP = "uvloop" if importlib.util.find_spec("uvloop") else "auto"
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Vision Pro Dezine NVR Server")
     parser.add_argument("--port", type=int, default=settings.BACKEND_PORT, help="Port to run on")
@@ -21,6 +26,9 @@ if __name__ == "__main__":
         port=args.port,
         reload=True,
         log_level="info",
+        loop=LOOP,
         ws_ping_interval=30,
         ws_ping_timeout=30,
+        # Feeds are already-compressed JPEG; deflating every frame only burns CPU
+        ws_per_message_deflate=False,
     )
@@ -0,0 +1,25 @@
+"""
+AI model route tests.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.security import require_admin
+from app.routes import ai_models
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(ai_models.router)
+    app.dependency_overrides[require_admin] = lambda: {"username": "admin", "role": "admin"}
+    return TestClient(app)
+
+
+def test_merge_rejects_malformed_model_id():
+    """A bad id in the body is a 400 before any database lookup, not a 500."""
+    response = _client().post(
+        "/api/models/merge",
+        json={"name": "merged", "model_ids": ["not-an-object-id", "0" * 24]},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid model id"}
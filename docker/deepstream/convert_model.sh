@@ -1,26 +1,19 @@
 #!/bin/bash
 # Run inside the DeepStream container to convert yolov8n.pt → TensorRT .engine
-# Usage: docker exec visionpro-deepstream /app/docker/deepstream/convert_model.sh
+# Usage: docker exec visionpro-deepstream /convert_model.sh [--force]
+#
+# Uses the same build as container startup (app.deepstream.trt_convert):
+# dynamic batch up to DS_MAX_BATCH, INT8 when CALIB_DIR holds calibration
+# frames, FP16 otherwise. An engine already stamped with that build is kept
+# unless --force is given.
 set -e
 
-echo "Converting YOLOv8n → TensorRT engine (FP16, imgsz=640)..."
-python3 -c "
-from ultralytics import YOLO
-import shutil, os
+ENGINE_PATH="${TRT_ENGINE_PATH:-/models/yolo/yolov8n.engine}"
 
-model = YOLO('/models/yolo/yolov8n.pt')
-model.export(
-    format='engine',
-    imgsz=640,
-    half=True,          # FP16
-    device=0,           # GPU 0
-    workspace=4,        # GB TensorRT workspace
-    verbose=False,
-)
-# ultralytics writes to ./yolov8n.engine by default — move it
-if os.path.exists('yolov8n.engine'):
-    shutil.move('yolov8n.engine', '/models/yolo/yolov8n.engine')
-    print('✅ Engine saved to /models/yolo/yolov8n.engine')
-else:
-    print('✅ Engine already at correct location')
-"
+if [ "$1" = "--force" ]; then
+    rm -f "$ENGINE_PATH" "${ENGINE_PATH%.*}.build"
+fi
+
+echo "Converting ${YOLO_PT_PATH:-/models/yolo/yolov8n.pt} → TensorRT engine (batch ≤ ${DS_MAX_BATCH:-16}, imgsz=640)..."
+cd /app
+python3 -m app.deepstream.trt_convert
@@ -46,14 +46,10 @@ fi
 for (( i=0; i<${#MERGED_PT_PATHS[@]}; i++ )); do
     PT_PATH=${MERGED_PT_PATHS[$i]}
     ENGINE_PATH=${MERGED_ENGINE_PATHS[$i]}
-    # Convert to TensorRT engine if not already done
-    if [ ! -f "$ENGINE_PATH" ]; then
-        echo "⚙️  TensorRT engine not found — converting $PT_PATH → engine (FP16)..."
-        YOLO_PT_PATH="$PT_PATH" TRT_ENGINE_PATH="$ENGINE_PATH" python3 /app/app/deepstream/trt_convert.py
-        echo "✅ TensorRT engine ready at $ENGINE_PATH"
-    else
-        echo "✅ TensorRT engine found: $ENGINE_PATH"
-    fi
+    # Build the TensorRT engine unless one stamped with the current batch
+    # size and precision already exists (older batch-1 engines are rebuilt)
+    YOLO_PT_PATH="$PT_PATH" TRT_ENGINE_PATH="$ENGINE_PATH" python3 /app/app/deepstream/trt_convert.py
+    echo "✅ TensorRT engine ready at $ENGINE_PATH"
 done
 
 echo "🎥 Starting GStreamer DeepStream pipeline..."
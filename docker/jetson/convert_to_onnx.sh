@@ -35,7 +35,7 @@ from ultralytics import YOLO
 import shutil, os
 
 model = YOLO('$PT_FILE')
-result = model.export(format='onnx', imgsz=640, opset=12, simplify=True)
+result = model.export(format='onnx', imgsz=640, opset=12, simplify=True, dynamic=True)
 print(f'ONNX exported to: {result}')
 
 # Move to standard ONNX directory
@@ -56,7 +56,10 @@ else
         --onnx="$ONNX_FILE" \
         --saveEngine="$ENGINE_FILE" \
         --fp16 \
-        --memPoolSize=workspace:${WORKSPACE_GB}G
+        --memPoolSize=workspace:${WORKSPACE_GB}G \
+        --minShapes=images:1x3x640x640 \
+        --optShapes=images:${DS_MAX_BATCH:-16}x3x640x640 \
+        --maxShapes=images:${DS_MAX_BATCH:-16}x3x640x640
 
     echo "✅ Engine saved: $ENGINE_FILE"
 fi
@@ -57,7 +57,16 @@ convert_model() {
     local PT=$1
     local ONNX=$2
     local ENGINE=$3
-    
+    local STAMP="${ENGINE%.*}.build"
+    local WANT_STAMP="batch=${DS_MAX_BATCH:-16} precision=fp16"
+
+    # Engines (and ONNX exports) from before batched inference are static
+    # batch-1 and carry no build stamp — drop them so they are rebuilt
+    if [ -f "$ENGINE" ] && [ "$(cat "$STAMP" 2>/dev/null)" != "$WANT_STAMP" ]; then
+        echo "♻️  $ENGINE was not built for $WANT_STAMP — rebuilding"
+        rm -f "$ENGINE" "$ONNX"
+    fi
+
     # ── Step 1: Convert .pt → .onnx if needed ───────────────────────────────────
     if [ ! -f "$ONNX" ]; then
         echo "⚙️  ONNX model not found — converting $PT → ONNX..."
@@ -83,6 +92,9 @@ convert_pt_to_onnx(pt, onnx)
             --saveEngine="$ENGINE" \
             --fp16 \
             --memPoolSize=workspace:${TRT_WORKSPACE_GB:-2}G \
+            --minShapes=images:1x3x640x640 \
+            --optShapes=images:${DS_MAX_BATCH:-16}x3x640x640 \
+            --maxShapes=images:${DS_MAX_BATCH:-16}x3x640x640 \
             2>&1 | tail -20
 
         if [ ! -f "$ENGINE" ]; then
@@ -91,7 +103,7 @@ convert_pt_to_onnx(pt, onnx)
 from ultralytics import YOLO
 import shutil, os
 model = YOLO(os.environ['YOLO_PT_PATH'])
-model.export(format='engine', imgsz=640, half=True, device=0, workspace=int(os.environ.get('TRT_WORKSPACE_GB', '2')))
+model.export(format='engine', imgsz=640, half=True, dynamic=True, batch=int(os.environ.get('DS_MAX_BATCH', '16')), device=0, workspace=int(os.environ.get('TRT_WORKSPACE_GB', '2')))
 generated = os.environ['YOLO_PT_PATH'].replace('.pt', '.engine')
 engine_out = os.environ['TRT_ENGINE_PATH']
 if generated != engine_out and os.path.exists(generated):
@@ -101,6 +113,9 @@ print(f'✅ Engine saved to {engine_out}')
 "
         fi
 
+        if [ -f "$ENGINE" ]; then
+            echo "$WANT_STAMP" > "$STAMP"
+        fi
         echo "✅ TensorRT engine ready at $ENGINE"
     else
         echo "✅ TensorRT engine found: $ENGINE"
@@ -32,31 +32,25 @@ const Analytics: React.FC = () => {
 
     useEffect(() => {
         setLoading(true);
-        Promise.all([
-            analyticsApi.overview(days),
-            analyticsApi.daily(days),
-            analyticsApi.trends(days),
-            analyticsApi.cameras(days),
-            analyticsApi.topHours(days),
-        ]).then(([ov, dly, trnd, cams, hrs]) => {
-            setOverview(ov.data);
+        analyticsApi.dashboard(days).then(({ data }) => {
+            setOverview(data);
 
-            const dailyMap = dly.data.daily_trends || {};
+            const dailyMap = data.daily_trends || {};
             const dailySeries = Object.entries(dailyMap).map(([date, types]: [string, any]) => ({
                 date: date.slice(5),
                 ...types,
             })).sort((a, b) => a.date.localeCompare(b.date));
             setDaily(dailySeries);
 
-            const hourlyMap = trnd.data.hourly_trends || {};
+            const hourlyMap = data.hourly_trends || {};
             const hourlySeries = Array.from({ length: 24 }, (_, h) => ({
                 hour: `${h.toString().padStart(2, '0')}:00`,
                 ...(hourlyMap[h] || {}),
             }));
             setHourly(hourlySeries);
 
-            setCameras(cams.data.cameras || []);
-            setTopHours(hrs.data.top_hours || []);
+            setCameras(data.cameras || []);
+            setTopHours(data.top_hours || []);
         }).finally(() => setLoading(false));
     }, [days]);
 
@@ -448,33 +448,55 @@ const LiveCameraFeed: React.FC<LiveCanvasProps> = ({ cameraId, cameraName, locat
 const Dashboard: React.FC = () => {
     const [cameras, setCameras] = useState<any[]>([]);
     const [stats, setStats] = useState<any>(null);
+    // camera_id -> stream connected, from the in-memory stream health endpoint
+    const [streamConnected, setStreamConnected] = useState<Record<string, boolean>>({});
     const [eventCount, setEventCount] = useState(0);
     const [loading, setLoading] = useState(true);
     const [addDialogOpen, setAddDialogOpen] = useState(false);
     const [newCamera, setNewCamera] = useState({ name: '', rtsp_url: '', location: '' });
     const [addError, setAddError] = useState('');
 
-    const fetchData = async () => {
+    const fetchCameras = async () => {
+        try {
+            const camRes = await camerasApi.list();
+            setCameras(camRes.data);
+        } catch (err) {
+            console.error('Dashboard fetch error:', err);
+        }
+    };
+
+    const fetchStats = async () => {
         try {
-            const [camRes, statsRes, evtRes] = await Promise.all([
-                camerasApi.list(),
+            const [statsRes, evtRes, streamsRes] = await Promise.all([
                 systemApi.getStats(),
                 eventsApi.count(),
+                camerasApi.allStreamStatuses(),
             ]);
-            setCameras(camRes.data);
             setStats(statsRes.data);
             setEventCount(evtRes.data.count || 0);
+            setStreamConnected(Object.fromEntries(
+                streamsRes.data.map((s: any) => [s.camera_id, s.connected])
+            ));
         } catch (err) {
             console.error('Dashboard fetch error:', err);
-        } finally {
-            setLoading(false);
         }
     };
 
+    const fetchData = async () => {
+        await Promise.all([fetchCameras(), fetchStats()]);
+        setLoading(false);
+    };
+
     useEffect(() => {
         fetchData();
-        const interval = setInterval(fetchData, 10000); // refresh stats every 10s
-        return () => clearInterval(interval);
+        // Stats and stream health change constantly (the health endpoint is
+        // served from memory); the camera list only when someone edits it
+        const statsInterval = setInterval(fetchStats, 10000);
+        const camerasInterval = setInterval(fetchCameras, 60000);
+        return () => {
+            clearInterval(statsInterval);
+            clearInterval(camerasInterval);
+        };
     }, []);
 
     const handleAddCamera = async () => {
@@ -506,7 +528,8 @@ const Dashboard: React.FC = () => {
         {
             label: 'Cameras',
             value: cameras.length,
-            online: cameras.filter(c => c.enabled).length,
+            // Cameras without a local stream (e.g. DeepStream mode) fall back to enabled
+            online: cameras.filter(c => streamConnected[c.id] ?? c.enabled).length,
             icon: <Videocam />,
             color: '#4F8EF7',
         },
@@ -135,6 +135,7 @@ export const systemApi = {
 
 // --- Analytics API ---
 export const analyticsApi = {
+    dashboard: (days?: number) => api.get('/analytics/dashboard', { params: { days } }),
     overview: (days?: number) => api.get('/analytics/overview', { params: { days } }),
     trends: (days?: number, cameraId?: string) => api.get('/analytics/trends', { params: { days, camera_id: cameraId } }),
     daily: (days?: number, cameraId?: string) => api.get('/analytics/daily', { params: { days, camera_id: cameraId } }),